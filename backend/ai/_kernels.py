@@ -0,0 +1,41 @@
+"""
+Numeric kernels for transaction aggregation
+JIT-compiled with Numba when available, NumPy otherwise
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # optional speedup, fall back to NumPy
+    njit = None
+
+if njit is not None:
+    @njit("UniTuple(float64, 3)(float64[:])", cache=True, nogil=True)
+    def reduce_signed_sums(amounts):
+        """Single pass over amounts returning (negative total, positive total, count)"""
+        negative = 0.0
+        positive = 0.0
+        for amount in amounts:
+            if amount < 0:
+                negative += amount
+            elif amount > 0:
+                positive += amount
+        return negative, positive, float(amounts.shape[0])
+
+    @njit("float64[:](intp[:], float64[:], intp)", cache=True, nogil=True)
+    def category_sums(codes, amounts, n_categories):
+        """Sum absolute amounts per category code"""
+        sums = np.zeros(n_categories)
+        for i in range(codes.shape[0]):
+            sums[codes[i]] += abs(amounts[i])
+        return sums
+else:
+    def reduce_signed_sums(amounts):
+        """Return (negative total, positive total, count) of amounts"""
+        return (float(amounts[amounts < 0].sum()), float(amounts[amounts > 0].sum()),
+                float(amounts.shape[0]))
+
+    def category_sums(codes, amounts, n_categories):
+        """Sum absolute amounts per category code"""
+        return np.bincount(codes, weights=np.abs(amounts), minlength=n_categories)
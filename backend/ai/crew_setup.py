@@ -4,9 +4,20 @@ Initializes the multi-agent system for AI Budget Assistant
 """
 
 import os
-from typing import Dict, Any, Optional
-from crewai import Agent, Task, Crew, Process
+import re
+import sys
+import string
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple, Mapping
+from crewai import Agent, Task
 from langchain_openai import ChatOpenAI
+from langchain.callbacks.base import BaseCallbackHandler
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 from .agents.financial_analyst import FinancialAnalystAgent
@@ -14,161 +25,376 @@ from .agents.transaction_processor import TransactionProcessorAgent
 from .agents.budget_advisor import BudgetAdvisorAgent
 from .agents.insights_generator import InsightsGeneratorAgent
 from .agents.query_handler import QueryHandlerAgent
+from .local_llm import try_local_response
+from .prompt_context import pack_context
+from .response_cache import SemanticCache, cache_key
+from .stream_filter import FinalAnswerStream
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (containerized deploys inject env; SKIP_DOTENV avoids the file scan)
+if not os.getenv("SKIP_DOTENV"):
+    load_dotenv()
 
-class CrewAIManager:
-    """Manages the CrewAI multi-agent system for financial assistance."""
-    
-    def __init__(self):
-        self.llm = self._initialize_llm()
-        self.agents: Dict[str, Agent] = {}
-        self.crew: Optional[Crew] = None
-        self._initialize_agents()
-        self._setup_crew()
-    
-    def _initialize_llm(self) -> ChatOpenAI:
-        """Initialize the LLM for agent communication."""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-        
-        return ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0.1,  # Low temperature for consistent financial advice
-            api_key=api_key
-        )
-    
-    def _initialize_agents(self):
-        """Initialize all specialized agents."""
-        
+_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Per-step agent output is expensive stdout I/O; opt in with CREW_VERBOSE=1
+VERBOSE = os.getenv("CREW_VERBOSE", "0") == "1"
+logging.getLogger("crewai").setLevel(logging.DEBUG if VERBOSE else logging.WARNING)
+
+EXACT_CACHE_MAXSIZE = 4096
+
+_TASK_TEMPLATE = string.Template("""
+            Process the following user query about their personal finances:
+            
+            Query: $query
+            
+            Context: $context
+            
+            Provide a helpful, accurate, and actionable response. If you need to 
+            gather data or perform analysis, coordinate with the appropriate 
+            specialized agents. Ensure your response is clear and addresses 
+            the user's specific question or request.
+            """)
+_TASK_EXPECTED_OUTPUT = "A clear, helpful response to the user's financial query"
+_FINAL_EXPECTED_OUTPUT = (
+    "A JSON object with keys: answer (the clear, helpful response to the user's "
+    "financial query), entities (extracted fields such as amount, category, date) "
+    "and followups (suggested follow-up questions)"
+)
+STREAM_TIMEOUT_SECONDS = 30
+_STREAM_DONE = object()
+
+def _static_text(text: str) -> str:
+    """Collapse source indentation and intern a constant prompt string."""
+    return sys.intern(" ".join(text.split()))
+
+# Agent definitions are static, so tool lists are resolved once at import
+# rather than on every CrewAIManager construction.
+_AGENT_SPECS = (
+    {
         # Financial Analyst Agent
-        self.agents["financial_analyst"] = Agent(
-            role="Financial Data Analyst",
-            goal="Analyze financial data, identify trends, detect anomalies, and provide insights",
-            backstory="""You are an expert financial analyst with deep knowledge of personal 
+        "name": "financial_analyst",
+        "role": "Financial Data Analyst",
+        "goal": "Analyze financial data, identify trends, detect anomalies, and provide insights",
+        "backstory": """You are an expert financial analyst with deep knowledge of personal 
             finance patterns, spending behaviors, and financial health indicators. You excel 
             at identifying unusual spending patterns, trends, and opportunities for optimization.""",
-            tools=FinancialAnalystAgent.get_tools(),
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False
-        )
-        
+        "tools": FinancialAnalystAgent.get_tools(),
+        "allow_delegation": False,
+    },
+    {
         # Transaction Processor Agent
-        self.agents["transaction_processor"] = Agent(
-            role="Transaction Processing Specialist",
-            goal="Process, categorize, and validate financial transactions with high accuracy",
-            backstory="""You are a meticulous transaction processing expert who specializes 
+        "name": "transaction_processor",
+        "role": "Transaction Processing Specialist",
+        "goal": "Process, categorize, and validate financial transactions with high accuracy",
+        "backstory": """You are a meticulous transaction processing expert who specializes 
             in categorizing financial transactions, detecting duplicates, and ensuring data 
             accuracy. You understand various transaction formats and can intelligently 
             categorize expenses based on merchant names, amounts, and patterns.""",
-            tools=TransactionProcessorAgent.get_tools(),
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False
-        )
-        
+        "tools": TransactionProcessorAgent.get_tools(),
+        "allow_delegation": False,
+    },
+    {
         # Budget Advisor Agent
-        self.agents["budget_advisor"] = Agent(
-            role="Personal Budget Advisor",
-            goal="Create, optimize, and manage budgets while providing personalized financial advice",
-            backstory="""You are a certified financial planner with expertise in personal 
+        "name": "budget_advisor",
+        "role": "Personal Budget Advisor",
+        "goal": "Create, optimize, and manage budgets while providing personalized financial advice",
+        "backstory": """You are a certified financial planner with expertise in personal 
             budgeting, goal setting, and financial optimization. You help users create 
             realistic budgets, set achievable financial goals, and provide actionable 
             advice for improving their financial health.""",
-            tools=BudgetAdvisorAgent.get_tools(),
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False
-        )
-        
+        "tools": BudgetAdvisorAgent.get_tools(),
+        "allow_delegation": False,
+    },
+    {
         # Insights Generator Agent
-        self.agents["insights_generator"] = Agent(
-            role="Financial Insights Specialist",
-            goal="Generate comprehensive financial reports, summaries, and actionable insights",
-            backstory="""You are a financial insights expert who excels at creating 
+        "name": "insights_generator",
+        "role": "Financial Insights Specialist",
+        "goal": "Generate comprehensive financial reports, summaries, and actionable insights",
+        "backstory": """You are a financial insights expert who excels at creating 
             clear, actionable reports and summaries. You can identify key financial 
             patterns, generate 'What Changed?' analyses, and provide forecasting 
             insights that help users understand their financial trajectory.""",
-            tools=InsightsGeneratorAgent.get_tools(),
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False
-        )
-        
+        "tools": InsightsGeneratorAgent.get_tools(),
+        "allow_delegation": False,
+    },
+    {
         # Query Handler Agent (Master Coordinator)
-        self.agents["query_handler"] = Agent(
-            role="AI Assistant Coordinator",
-            goal="Understand user queries, coordinate agent responses, and provide unified assistance",
-            backstory="""You are the master coordinator of the AI Budget Assistant system. 
+        "name": "query_handler",
+        "role": "AI Assistant Coordinator",
+        "goal": "Understand user queries, coordinate agent responses, and provide unified assistance",
+        "backstory": """You are the master coordinator of the AI Budget Assistant system. 
             You understand natural language queries about personal finance, coordinate 
             with specialized agents to gather information, and provide clear, helpful 
             responses to users. You maintain conversation context and ensure responses 
             are accurate and actionable.""",
-            tools=QueryHandlerAgent.get_tools(),
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=True  # Can delegate to other agents
-        )
+        "tools": QueryHandlerAgent.get_tools(),
+        "allow_delegation": True,  # Can delegate to other agents
+    },
+)
+
+# Role, goal and backstory are rendered into every agent prompt; keep them
+# interned and byte-stable so prompt prefixes are identical across turns.
+for _spec in _AGENT_SPECS:
+    for _field in ("role", "goal", "backstory"):
+        _spec[_field] = _static_text(_spec[_field])
+del _spec, _field
+
+# Specialist roster for the coordinator, rendered once instead of per query
+_MANAGER_PREFIX = sys.intern("\n".join(
+    f"{spec['role']}: {spec['backstory']}"
+    for spec in _AGENT_SPECS if spec["name"] != "query_handler"
+))
+
+# Queries that need multi-step reasoning; everything else is a lookup the
+# local model can answer without a hierarchical GPT-4 crew run (the crew still
+# answers when no local model is reachable).
+_CREW_QUERY_PATTERN = re.compile(
+    r"\b(?:why|compare|comparison|forecast|predict|project|what changed|trend|plan|optimi[sz]e)\b",
+    re.IGNORECASE
+)
+CREW_TRANSACTION_THRESHOLD = 20
+
+def _needs_crew(query: str, context: Optional[Dict[str, Any]]) -> bool:
+    """Cheap heuristic deciding whether a query needs the multi-agent crew."""
+    if _CREW_QUERY_PATTERN.search(query) or query.count("?") > 1:
+        return True
+    transactions = (context or {}).get("transactions") or []
+    return len(transactions) > CREW_TRANSACTION_THRESHOLD
+
+class QueryResponse(BaseModel):
+    """Structured crew answer, parsed once so callers need no re-parsing."""
+    answer: str = Field(..., description="Response to the user's query")
+    entities: Dict[str, Any] = Field(default_factory=dict, description="Extracted fields (amount, category, date)")
+    followups: List[str] = Field(default_factory=list, description="Suggested follow-up questions")
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """Explicit agent DAG for a query: independent agents run concurrently, then one composes the answer."""
+    parallel: Tuple[str, ...]
+    final: str
+
+_PLAN_RULES = (
+    (re.compile(r"\b(?:forecast|predict|what changed|trend|summary|report)\b", re.IGNORECASE),
+     QueryPlan(parallel=("transaction_processor", "financial_analyst"), final="insights_generator")),
+    (re.compile(r"\b(?:budget|plan|allocate|save|savings|goal)\b", re.IGNORECASE),
+     QueryPlan(parallel=("financial_analyst",), final="budget_advisor")),
+    (re.compile(r"\b(?:transactions?|categor\w*|merchant|duplicate|spend\w*|expenses?)\b", re.IGNORECASE),
+     QueryPlan(parallel=("transaction_processor",), final="financial_analyst")),
+)
+_DEFAULT_PLAN = QueryPlan(parallel=(), final="query_handler")
+
+def _plan_for_query(query: str) -> QueryPlan:
+    """Select the agents needed for a query by intent keywords."""
+    for pattern, plan in _PLAN_RULES:
+        if pattern.search(query):
+            return plan
+    return _DEFAULT_PLAN
+
+class _TokenStreamHandler(BaseCallbackHandler):
+    """Relays final-answer tokens from the crew worker thread to an asyncio queue."""
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self._loop = loop
+        self._queue = queue
+        self._answer = FinalAnswerStream()
+    
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        self._answer.reset()
+    
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        text = self._answer.feed(token)
+        if text:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, text)
+
+class CrewAIManager:
+    """Manages the CrewAI multi-agent system for financial assistance."""
+    
+    def __init__(self):
+        self.llm = self._initialize_llm()
+        self.agents: Dict[str, Agent] = {}
+        self._exact_cache: "OrderedDict[str, QueryResponse]" = OrderedDict()
+        self._semantic_cache = SemanticCache()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Bound in-flight crew runs to the provider's request budget
+        self._sem = asyncio.Semaphore(int(os.getenv("CREW_MAX_INFLIGHT", "32")))
+        self._initialize_agents()
     
-    def _setup_crew(self):
-        """Setup the CrewAI crew with agents and process configuration."""
-        agent_list = list(self.agents.values())
+    def _initialize_llm(self) -> ChatOpenAI:
+        """Initialize the LLM for agent communication."""
+        if not _API_KEY:
+            raise ValueError("OPENAI_API_KEY environment variable is required")
         
-        self.crew = Crew(
-            agents=agent_list,
-            process=Process.hierarchical,  # Query handler coordinates others
-            manager_llm=self.llm,
-            verbose=True,
-            memory=True,  # Enable conversation memory
-            max_iter=3,  # Limit iterations to prevent infinite loops
-            max_execution_time=30  # 30 second timeout for responses
+        return ChatOpenAI(
+            model="gpt-4-turbo-preview",
+            temperature=0.1,  # Low temperature for consistent financial advice
+            api_key=_API_KEY,
+            streaming=True
         )
     
-    async def process_query(self, query: str, context: Dict[str, Any] = None) -> str:
+    def _initialize_agents(self):
+        """Initialize all specialized agents."""
+        self.agents = self._build_agents(self.llm)
+        # Agents are fixed after init, so status is a prebuilt read-only view
+        self._status_snapshot = MappingProxyType({name: "active" for name in self.agents})
+    
+    @staticmethod
+    def _build_agents(llm: ChatOpenAI, names: Optional[Tuple[str, ...]] = None) -> Dict[str, Agent]:
+        """Build agents bound to the given LLM (all of them unless names are given)."""
+        return {
+            spec["name"]: Agent(
+                role=spec["role"],
+                goal=spec["goal"],
+                backstory=spec["backstory"],
+                tools=spec["tools"],
+                llm=llm,
+                verbose=VERBOSE,
+                allow_delegation=spec["allow_delegation"]
+            )
+            for spec in _AGENT_SPECS
+            if names is None or spec["name"] in names
+        }
+    
+    async def process_query(self, query: str, context: Dict[str, Any] = None,
+                            user_id: Optional[str] = None) -> QueryResponse:
         """Process a user query through the CrewAI system."""
-        if not self.crew:
-            raise RuntimeError("CrewAI system not initialized")
+        if not _needs_crew(query, context):
+            answer = await try_local_response(query, context or {}, user_id=user_id)
+            if answer is not None:
+                return QueryResponse(answer=answer)
         
-        # Create a task for the query
-        task = Task(
-            description=f"""
-            Process the following user query about their personal finances:
-            
-            Query: {query}
-            
-            Context: {context or {}}
-            
-            Provide a helpful, accurate, and actionable response. If you need to 
-            gather data or perform analysis, coordinate with the appropriate 
-            specialized agents. Ensure your response is clear and addresses 
-            the user's specific question or request.
-            """,
-            agent=self.agents["query_handler"],
-            expected_output="A clear, helpful response to the user's financial query"
+        key = cache_key(query, context)
+        if key in self._exact_cache:
+            self._exact_cache.move_to_end(key)
+            return self._exact_cache[key]
+        
+        cached = self._semantic_cache.lookup(query, context)
+        if cached is not None:
+            return cached
+        
+        # Coalesce concurrent duplicates: only the first caller runs the crew,
+        # identical in-flight queries await the same future.
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            async with self._sem:
+                result = await self._run_plan(_plan_for_query(query), query, context)
+            self._remember(key, query, context, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when no duplicate is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+    
+    async def stream_query(self, query: str, context: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Process a user query, yielding the final answer's tokens as they are generated."""
+        key = cache_key(query, context)
+        cached = self._exact_cache.get(key)
+        if cached is None:
+            cached = self._semantic_cache.lookup(query, context)
+        if cached is not None:
+            yield cached.answer
+            return
+        
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        plan = _plan_for_query(query)
+        # Only the final agent streams, through a per-stream LLM copy, so
+        # concurrent runs never see each other's tokens and upstream agents'
+        # output stays internal
+        llm = self.llm.copy(update={"callbacks": [_TokenStreamHandler(loop, queue)]})
+        agents = {**self.agents, **self._build_agents(llm, (plan.final,))}
+        
+        async with self._sem:
+            # Plain-text final answer: a structured (JSON) answer would stream as JSON
+            future = asyncio.ensure_future(
+                self._run_plan(plan, query, context, agents=agents, structured=False)
+            )
+            future.add_done_callback(lambda _: queue.put_nowait(_STREAM_DONE))
+            try:
+                streamed = False
+                deadline = loop.time() + STREAM_TIMEOUT_SECONDS
+                while True:
+                    token = await asyncio.wait_for(queue.get(), timeout=max(deadline - loop.time(), 0))
+                    if token is _STREAM_DONE:
+                        break
+                    streamed = True
+                    yield token
+                
+                # (answer-only results aren't cached: process_query callers expect entities)
+                result = await future
+                if not streamed:
+                    # The agent's output carried no final-answer marker
+                    yield result.answer
+            finally:
+                # Timed out or abandoned by the consumer: stop the run
+                if not future.done():
+                    future.cancel()
+    
+    async def process_queries(self, queries: List[str], context: Dict[str, Any] = None,
+                              user_id: Optional[str] = None) -> List[QueryResponse]:
+        """Process a batch of queries concurrently (bounded by CREW_MAX_INFLIGHT)."""
+        return await asyncio.gather(*(self.process_query(query, context, user_id) for query in queries))
+    
+    def _remember(self, key: str, query: str, context: Optional[Dict[str, Any]], result: QueryResponse) -> None:
+        """Store a crew result in the exact and semantic caches."""
+        self._exact_cache[key] = result
+        if len(self._exact_cache) > EXACT_CACHE_MAXSIZE:
+            self._exact_cache.popitem(last=False)
+        self._semantic_cache.store(query, context, result)
+    
+    def _create_task(self, agents: Dict[str, Agent], agent_name: str, query: str,
+                     context: Optional[Dict[str, Any]], final: bool = False) -> Task:
+        """Create a task for the query assigned to a single agent (final tasks return a QueryResponse)."""
+        description = _TASK_TEMPLATE.substitute(query=query, context=pack_context(context))
+        if agent_name == "query_handler":
+            description = f"Specialists:\n{_MANAGER_PREFIX}\n{description}"
+        return Task(
+            description=description,
+            agent=agents[agent_name],
+            expected_output=_FINAL_EXPECTED_OUTPUT if final else _TASK_EXPECTED_OUTPUT,
+            output_pydantic=QueryResponse if final else None
         )
+    
+    async def _run_plan(self, plan: QueryPlan, query: str, context: Dict[str, Any] = None,
+                        agents: Optional[Dict[str, Agent]] = None, structured: bool = True) -> QueryResponse:
+        """Run a query plan (uncached): parallel agents first, then the final agent (answer only unless structured)."""
+        agents = agents or self.agents
+        # Agent execution is synchronous; run each on a worker thread
+        upstream = await asyncio.gather(*(
+            asyncio.to_thread(agents[name].execute_task, self._create_task(agents, name, query, context))
+            for name in plan.parallel
+        ))
         
-        # Execute the task
-        result = self.crew.kickoff(tasks=[task])
-        return result
+        # Task.execute (rather than Agent.execute_task) applies output_pydantic
+        final_task = self._create_task(agents, plan.final, query, context, final=structured)
+        result = await asyncio.to_thread(final_task.execute, context="\n\n".join(upstream) or None)
+        if isinstance(result, QueryResponse):
+            return result
+        return QueryResponse(answer=str(result))
     
-    def get_agent_status(self) -> Dict[str, str]:
+    def get_agent_status(self) -> Mapping[str, str]:
         """Get the status of all agents."""
-        return {
-            name: "active" if agent else "inactive" 
-            for name, agent in self.agents.items()
-        }
+        return self._status_snapshot
 
 # Global CrewAI manager instance
 crew_manager: Optional[CrewAIManager] = None
 
+@lru_cache(maxsize=1)
+def _build_crew_manager() -> CrewAIManager:
+    """Construct the process-wide CrewAI manager (agents are immutable after init)."""
+    return CrewAIManager()
+
 async def initialize_crew() -> CrewAIManager:
     """Initialize the global CrewAI manager."""
     global crew_manager
-    if crew_manager is None:
-        crew_manager = CrewAIManager()
+    crew_manager = _build_crew_manager()
     return crew_manager
 
 async def get_crew_manager() -> CrewAIManager:
@@ -1,22 +1,48 @@
 """
 Local LLM adapter (lightweight stub)
 
-This module provides a single async entrypoint `generate_local_response` that will:
+This module provides an async entrypoint `generate_local_response` that will:
 - Use a real local LLM client if available (e.g. Ollama, Transformers) when installed.
 - Otherwise return a safe stub response indicating local processing.
 
+`try_local_response` returns None instead of the stub, for callers that can
+answer some other way.
+
 Replace the stub implementation with a real client integration when a local LLM is available.
 """
 
-import asyncio
+import os
 import logging
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
+from .prompt_context import pack_context
+
 logger = logging.getLogger("local_llm")
 
-async def generate_local_response(user_input: str, context: Dict[str, Any], user_id: Optional[str] = None) -> str:
+# Static instructions go first so the byte-identical prefix can be reused by the
+# server's prompt cache; per-request data (context, user turn) comes last.
+SYSTEM = "You are the AI Budget Assistant. Respond concisely.\n"
+
+# Quantized model tag. Q4_K_M is the best memory/throughput trade-off on CPUs and
+# small GPUs for short replies; prefer a Q8_0 tag on AVX-512/AMX hosts, or a bf16
+# tag on BF16-capable CPUs when quality matters more than memory.
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", os.getenv("OLLAMA_MODEL", "llama3.1:8b-instruct-q4_K_M"))
+
+# Log the missing-client fallback once instead of on every call
+_fallback_logged = False
+
+@lru_cache(maxsize=1)
+def _client():
+    """Return the shared Ollama async client (keeps HTTP connections alive across calls)."""
+    # Ollama python client isn't a guaranteed dependency; import lazily.
+    import ollama  # type: ignore
+
+    return ollama.AsyncClient(host=os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434"))
+
+async def try_local_response(user_input: str, context: Dict[str, Any], user_id: Optional[str] = None) -> Optional[str]:
     """
-    Generate a response using a local LLM if available.
+    Generate a response with the local LLM.
 
     Args:
         user_input: sanitized user input string
@@ -24,22 +50,43 @@ async def generate_local_response(user_input: str, context: Dict[str, Any], user
         user_id: optional user identifier
 
     Returns:
-        A text response generated locally.
+        The locally generated text, or None when no local LLM client is available.
     """
     # Try to use Ollama (if installed). This is optional; keep fallback lightweight.
     try:
-        # Ollama python client isn't a guaranteed dependency; import lazily.
-        import ollama  # type: ignore
-
-        # Example placeholder usage - adapt according to the actual client API
-        # The real integration should include robust prompt templates, timeouts, and error handling.
-        client = ollama.Ollama()
-        prompt = f"User ({user_id}): {user_input}\nContext: {context}\nRespond concisely."
-        result = client.create(prompt)  # placeholder API call
-        return result.text if hasattr(result, "text") else str(result)
+        messages = [
+            {"role": "system", "content": SYSTEM},
+            {"role": "system", "content": pack_context(context)},
+            {"role": "user", "content": f"[{user_id}] {user_input}" if user_id else user_input},
+        ]
+        result = await _client().chat(
+            model=LOCAL_LLM_MODEL,
+            messages=messages,
+            options={"num_predict": 512, "temperature": 0.1},
+            keep_alive="30m"  # keep the model resident to avoid cold reloads
+        )
+        return result["message"]["content"]
     except Exception:
+        global _fallback_logged
+        if not _fallback_logged:
+            logger.warning("Local LLM client not available")
+            _fallback_logged = True
+        return None
+
+async def generate_local_response(user_input: str, context: Dict[str, Any], user_id: Optional[str] = None) -> str:
+    """
+    Generate a response using a local LLM if available.
+
+    Args:
+        user_input: sanitized user input string
+        context: anonymized or original context dict
+        user_id: optional user identifier
+
+    Returns:
+        A text response generated locally.
+    """
+    response = await try_local_response(user_input, context, user_id)
+    if response is None:
         # Fallback stub response when no local LLM client is available
-        await asyncio.sleep(0.05)  # simulate small processing delay
-        stub = f"(local) Processed locally: {user_input[:500]}"
-        logger.debug("Local LLM client not available - returning stub response")
-        return stub
+        return f"(local) Processed locally: {user_input[:500]}"
+    return response
@@ -0,0 +1,63 @@
+"""
+Prompt context packing
+Bounds the size of the context dict serialized into LLM prompts
+"""
+
+import json
+import logging
+from typing import Dict, Any, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to stdlib json
+    orjson = None
+
+logger = logging.getLogger("prompt_context")
+
+MAX_CONTEXT_CHARS = 6000
+MAX_CONTEXT_TRANSACTIONS = 50
+
+# Keys kept when the full context exceeds the budget; list values keep their tail
+_CONTEXT_WHITELIST = (
+    "transactions", "recent_transactions", "budget", "budget_summary",
+    "goals", "monthly_income", "current_expenses"
+)
+
+def dumps_sorted(value: Any) -> bytes:
+    """Serialize to compact, sorted-key JSON bytes (byte-stable for cache keys)"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+def _dumps(value: Any) -> str:
+    return dumps_sorted(value).decode()
+
+def pack_context(context: Optional[Dict[str, Any]], max_chars: int = MAX_CONTEXT_CHARS) -> str:
+    """Serialize context deterministically, dropping bulky fields beyond max_chars"""
+    packed = _dumps(context or {})
+    if len(packed) <= max_chars:
+        return packed
+
+    reduced = {}
+    for key in _CONTEXT_WHITELIST:
+        if key in context:
+            value = context[key]
+            reduced[key] = value[-MAX_CONTEXT_TRANSACTIONS:] if isinstance(value, list) else value
+    if not reduced:
+        logger.warning("Oversized prompt context has no whitelisted keys; sending key names only")
+        reduced["omitted_keys"] = sorted(map(str, context))
+
+    # Drop whole items (never cut the JSON): halve the longest list, keeping
+    # its newest entries, then drop fields from the end of the whitelist
+    packed = _dumps(reduced)
+    while len(packed) > max_chars:
+        lists = [key for key, value in reduced.items() if isinstance(value, list) and value]
+        if lists:
+            key = max(lists, key=lambda k: len(reduced[k]))
+            items = reduced[key]
+            reduced[key] = items[len(items) // 2:] if len(items) > 1 else []
+        else:
+            reduced.popitem()
+        packed = _dumps(reduced)
+    logger.debug("Context truncated for prompt (%d chars)", len(packed))
+    return packed
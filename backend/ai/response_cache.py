@@ -0,0 +1,146 @@
+"""
+Response caching for AI query processing
+Avoids repeated LLM round trips for repeated or paraphrased questions
+"""
+
+import re
+import time
+import zlib
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, FrozenSet, Tuple
+
+import numpy as np
+
+from .prompt_context import dumps_sorted
+
+# Tokens that must match exactly between two queries before a cached answer is reused
+# (amounts, calendar references). A paraphrase about a different month or amount is
+# semantically close but must never share an answer.
+_ENTITY_PATTERN = re.compile(
+    r"\$?\d[\d,]*(?:\.\d+)?"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b"
+    r"|\b(?:today|yesterday|tomorrow|week|month|quarter|year)\b",
+    re.IGNORECASE
+)
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for cache lookups (case and whitespace insensitive)"""
+    return " ".join(query.lower().split())
+
+def serialize_context(context: Optional[Dict[str, Any]]) -> str:
+    """Serialize context deterministically so equal dicts produce equal strings"""
+    return dumps_sorted(context or {}).decode()
+
+def cache_key(query: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """Canonical digest of a (query, context) pair for exact-match caching"""
+    payload = dumps_sorted({"q": query.strip().lower(), "c": context or {}})
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def extract_entities(text: str) -> FrozenSet[str]:
+    """Extract the non-negotiable entities (amounts, dates) from text"""
+    return frozenset(match.lower().replace(",", "") for match in _ENTITY_PATTERN.findall(text))
+
+@dataclass
+class _CacheEntry:
+    slot: int
+    response: Any
+    entities: FrozenSet[str]
+    created_at: float
+
+class SemanticCache:
+    """
+    In-memory semantic cache for LLM responses.
+
+    Entries are bucketed by an exact digest of their context; only the
+    normalized query is embedded, as a hashed bag-of-words vector (L2
+    normalized), so the inner product of two embeddings is their cosine
+    similarity. A lookup hits when the closest entry with the same context
+    is above the similarity threshold and its extracted entities match the
+    query exactly. Entries are evicted LRU.
+    """
+
+    def __init__(self, maxsize: int = 1024, threshold: float = 0.92, dimensions: int = 512):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self._vectors = np.zeros((maxsize, dimensions), dtype=np.float32)
+        self._slot_contexts = np.zeros(maxsize, dtype=np.uint64)
+        self._slot_keys: list = [None] * maxsize
+        self._free_slots = list(range(maxsize - 1, -1, -1))
+        self._entries: "OrderedDict[Tuple[int, str], _CacheEntry]" = OrderedDict()
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed text as a normalized hashed bag-of-words vector"""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            vector[zlib.crc32(token.encode()) % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    @staticmethod
+    def _context_id(context: Optional[Dict[str, Any]]) -> int:
+        """64-bit digest of the serialized context (contexts must match exactly)"""
+        digest = hashlib.blake2b(serialize_context(context).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def lookup(self, query: str, context: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """Return a cached response for a semantically equivalent query, if any"""
+        if not self._entries:
+            return None
+
+        text = normalize_query(query)
+        context_id = self._context_id(context)
+        similarities = self._vectors @ self._embed(text)
+        similarities[self._slot_contexts != np.uint64(context_id)] = -1.0
+        best_slot = int(similarities.argmax())
+        if similarities[best_slot] < self.threshold:
+            return None
+
+        key = self._slot_keys[best_slot]
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None or entry.entities != extract_entities(text):
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.response
+
+    def store(self, query: str, context: Optional[Dict[str, Any]], response: Any) -> None:
+        """Cache a response, evicting the least recently used entry when full"""
+        text = normalize_query(query)
+        context_id = self._context_id(context)
+        key = (context_id, text)
+        existing = self._entries.pop(key, None)
+        if existing is not None:
+            slot = existing.slot
+        else:
+            if not self._free_slots:
+                _, evicted = self._entries.popitem(last=False)
+                self._slot_keys[evicted.slot] = None
+                self._free_slots.append(evicted.slot)
+            slot = self._free_slots.pop()
+
+        self._vectors[slot] = self._embed(text)
+        self._slot_contexts[slot] = context_id
+        self._slot_keys[slot] = key
+        self._entries[key] = _CacheEntry(
+            slot=slot,
+            response=response,
+            entities=extract_entities(text),
+            created_at=time.time()
+        )
+
+    def clear(self) -> None:
+        """Drop all cached responses"""
+        self._vectors.fill(0.0)
+        self._slot_contexts.fill(0)
+        self._slot_keys = [None] * self.maxsize
+        self._free_slots = list(range(self.maxsize - 1, -1, -1))
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
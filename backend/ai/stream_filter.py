@@ -0,0 +1,38 @@
+"""
+Streamed answer filtering
+Picks the user-facing answer out of an agent's token stream
+"""
+
+# CrewAI agents reason in ReAct steps ("Thought:", "Action:", ...); only the
+# text after this marker is the answer
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+class FinalAnswerStream:
+    """Passes through the tokens of one LLM call that follow the final-answer marker"""
+
+    def __init__(self, marker: str = FINAL_ANSWER_MARKER):
+        self._marker = marker
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new LLM call"""
+        self._buffer = ""
+        self._answering = False
+        self._started = False
+
+    def feed(self, token: str) -> str:
+        """Return the part of token that belongs to the final answer ('' if none)"""
+        if not self._answering:
+            # The marker may be split across tokens
+            self._buffer += token
+            index = self._buffer.find(self._marker)
+            if index < 0:
+                return ""
+            self._answering = True
+            token = self._buffer[index + len(self._marker):]
+            self._buffer = ""
+        if not self._started:
+            # Drop the whitespace between the marker and the answer
+            token = token.lstrip()
+            self._started = bool(token)
+        return token
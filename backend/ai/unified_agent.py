@@ -4,20 +4,49 @@ Single intelligent agent with modular capabilities for financial assistance
 """
 
 import os
+import re
+import asyncio
 import json
+import time
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
 from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
+from itertools import count
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
 
+import numpy as np
+
+from ._kernels import reduce_signed_sums, category_sums
 from ..core.ai_security import get_ai_security_filter, get_privacy_manager
 from ..core.security import get_audit_logger
 
+try:
+    from .local_llm import generate_local_response
+except ImportError:
+    generate_local_response = None
+
 # AI logging
 ai_logger = logging.getLogger("unified_agent")
 audit_logger = get_audit_logger()
 
+# Entity patterns (simple regex for MVP); time periods in priority order
+_AMOUNT_RE = re.compile(r'\$?(\d+(?:\.\d{2})?)')
+_TIME_PERIODS = ("month", "week", "year")
+_TIME_RE = re.compile(
+    r'\b(?:(?P<month>this month|last month|monthly)'
+    r'|(?P<week>this week|last week|weekly)'
+    r'|(?P<year>this year|last year|yearly|annual))\b',
+    re.IGNORECASE
+)
+
+# Chat input repeats heavily (re-asks, quick replies); NLP results are pure
+# functions of the sanitized text, so they are memoized per process.
+NLP_CACHE_SIZE = 2048
+
 class QueryType(Enum):
     """Types of financial queries the agent can handle"""
     TRANSACTION_ANALYSIS = "transaction_analysis"
@@ -28,7 +57,7 @@ class QueryType(Enum):
     GENERAL_FINANCIAL = "general_financial"
     UNKNOWN = "unknown"
 
-@dataclass
+@dataclass(slots=True)
 class AgentResponse:
     """Structured response from the unified agent"""
     response_text: str
@@ -40,6 +69,46 @@ class AgentResponse:
     processing_time: float
     local_processing: bool
 
+@dataclass(slots=True)
+class TransactionArrays:
+    """Column view of a transaction list (built once per request)"""
+    amounts: np.ndarray        # float64 amounts
+    codes: np.ndarray          # intp category code per transaction
+    categories: List[str]      # category names indexed by code, first-seen order
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+def _tx_as_arrays(context: Dict[str, Any]) -> TransactionArrays:
+    """Convert context["transactions"] to columns, memoized on the (request-local) context"""
+    arrays = context.get("_tx_arrays")
+    if arrays is None:
+        transactions = context.get("transactions") or []
+        size = len(transactions)
+        # Unseen categories get the next code on first lookup (one hash probe each)
+        category_codes: Dict[str, int] = defaultdict(count().__next__)
+        arrays = TransactionArrays(
+            amounts=np.fromiter((t.get('amount', 0) for t in transactions),
+                                dtype=np.float64, count=size),
+            codes=np.fromiter(
+                (category_codes[t.get('category', 'Uncategorized')] for t in transactions),
+                dtype=np.intp, count=size
+            ),
+            categories=list(category_codes)
+        )
+        context["_tx_arrays"] = arrays
+    return arrays
+
+# Aggregations over at least this many transactions run on a worker thread;
+# below it the thread hop costs more than the work
+OFFLOAD_MIN_TRANSACTIONS = 500
+
+async def _aggregate(func, transactions: TransactionArrays, *args: Any) -> Dict[str, Any]:
+    """Run a synchronous transaction aggregation without blocking the event loop"""
+    if len(transactions) >= OFFLOAD_MIN_TRANSACTIONS:
+        return await asyncio.to_thread(func, transactions, *args)
+    return func(transactions, *args)
+
 class FinancialAnalysisModule:
     """Module for financial data analysis and insights"""
     
@@ -51,11 +120,11 @@ class FinancialAnalysisModule:
             "anomaly_detection": ["unusual", "strange", "different", "anomaly", "outlier"]
         }
     
-    async def analyze_spending_patterns(self, transactions: List[Dict[str, Any]], 
-                                      user_query: str) -> Dict[str, Any]:
+    def analyze_spending_patterns(self, transactions: TransactionArrays, 
+                                user_query: str) -> Dict[str, Any]:
         """Analyze spending patterns from transaction data"""
         try:
-            if not transactions:
+            if not len(transactions):
                 return {
                     "analysis": "No transaction data available for analysis",
                     "insights": [],
@@ -63,26 +132,25 @@ class FinancialAnalysisModule:
                 }
             
             # Basic analysis for MVP
-            total_spending = sum(t.get('amount', 0) for t in transactions if t.get('amount', 0) < 0)
             transaction_count = len(transactions)
+            total_spending, _, _ = reduce_signed_sums(transactions.amounts)
             avg_transaction = total_spending / transaction_count if transaction_count > 0 else 0
             
-            # Category breakdown
-            categories = {}
-            for transaction in transactions:
-                category = transaction.get('category', 'Uncategorized')
-                amount = abs(transaction.get('amount', 0))
-                categories[category] = categories.get(category, 0) + amount
+            # Category breakdown (summed by code in one pass)
+            sums = category_sums(transactions.codes, transactions.amounts, len(transactions.categories))
+            categories = dict(zip(transactions.categories, sums.tolist()))
             
             # Generate insights
             insights = []
             recommendations = []
             
             if categories:
-                top_category = max(categories, key=categories.get)
-                insights.append(f"Your highest spending category is {top_category} (${categories[top_category]:.2f})")
+                top_index = int(sums.argmax())
+                top_category = transactions.categories[top_index]
+                top_amount = float(sums[top_index])
+                insights.append(f"Your highest spending category is {top_category} (${top_amount:.2f})")
                 
-                if categories[top_category] > abs(total_spending) * 0.4:
+                if top_amount > abs(total_spending) * 0.4:
                     recommendations.append(f"Consider reviewing your {top_category} expenses - they represent a large portion of your spending")
             
             if transaction_count > 0:
@@ -168,17 +236,28 @@ class BudgetAdvisoryModule:
                 "advice": ["Please try again later"]
             }
 
+# Month label only changes monthly; reformat only when (year, month) rolls over
+_MONTH_CACHE = {"key": None, "label": ""}
+
+def _current_month_label() -> str:
+    """Current month as e.g. "January 2025" (cached per calendar month)"""
+    now = datetime.now()
+    key = (now.year, now.month)
+    if _MONTH_CACHE["key"] != key:
+        _MONTH_CACHE.update(key=key, label=now.strftime("%B %Y"))
+    return _MONTH_CACHE["label"]
+
 class InsightsGeneratorModule:
     """Module for generating financial insights and reports"""
     
-    async def generate_monthly_summary(self, transactions: List[Dict[str, Any]], 
-                                     budget_data: Dict[str, Any],
-                                     user_query: str) -> Dict[str, Any]:
+    def generate_monthly_summary(self, transactions: TransactionArrays, 
+                               budget_data: Dict[str, Any],
+                               user_query: str) -> Dict[str, Any]:
         """Generate monthly financial summary"""
         try:
-            current_month = datetime.now().strftime("%B %Y")
+            current_month = _current_month_label()
             
-            if not transactions:
+            if not len(transactions):
                 return {
                     "summary": f"No transactions found for {current_month}",
                     "highlights": ["Start tracking your expenses to get insights"],
@@ -186,8 +265,8 @@ class InsightsGeneratorModule:
                 }
             
             # Calculate basic metrics
-            total_income = sum(t.get('amount', 0) for t in transactions if t.get('amount', 0) > 0)
-            total_expenses = abs(sum(t.get('amount', 0) for t in transactions if t.get('amount', 0) < 0))
+            negative_total, total_income, _ = reduce_signed_sums(transactions.amounts)
+            total_expenses = abs(negative_total)
             net_flow = total_income - total_expenses
             
             # Generate highlights
@@ -229,6 +308,25 @@ class InsightsGeneratorModule:
                 "action_items": ["Please try again later"]
             }
 
+@lru_cache(maxsize=NLP_CACHE_SIZE)
+def _extract_entities_cached(user_input: str) -> Dict[str, Any]:
+    """Extract entities from user input (memoized; callers get a copy)"""
+    entities = {}
+    
+    # Extract amounts
+    amounts = _AMOUNT_RE.findall(user_input)
+    if amounts:
+        entities['amounts'] = [float(amount) for amount in amounts]
+    
+    # Extract time periods (one scan; month beats week beats year)
+    periods = {match.lastgroup for match in _TIME_RE.finditer(user_input)}
+    for period in _TIME_PERIODS:
+        if period in periods:
+            entities['time_period'] = period
+            break
+    
+    return entities
+
 class NLPProcessingModule:
     """Module for natural language processing and intent recognition"""
     
@@ -250,29 +348,63 @@ class NLPProcessingModule:
                 "save", "savings", "invest", "emergency fund", "goals"
             ]
         }
+        
+        # Keywords are matched in one scan by a lookahead alternation (longest
+        # first). The flat inverted index maps each matched keyword to every
+        # (keyword, query type) hit it implies, including keywords nested in
+        # it (e.g. "budget" in "budgeting").
+        keyword_types: Dict[str, List[QueryType]] = {}
+        for query_type, keywords in self.intent_keywords.items():
+            for keyword in keywords:
+                keyword_types.setdefault(keyword, []).append(query_type)
+        ordered = sorted(keyword_types, key=len, reverse=True)
+        # Leading first-character class rejects most positions in one set test
+        # before the alternation is tried (matters for long pasted inputs)
+        first_chars = "".join(sorted({keyword[0] for keyword in keyword_types}))
+        self._keyword_pattern = re.compile(
+            "(?=[%s])(?=(%s))" % (re.escape(first_chars), "|".join(map(re.escape, ordered)))
+        )
+        self._keyword_index: Dict[str, Tuple[Tuple[str, QueryType], ...]] = {
+            keyword: tuple(
+                (nested, query_type)
+                for nested in keyword_types if nested in keyword
+                for query_type in keyword_types[nested]
+            )
+            for keyword in keyword_types
+        }
+        self._type_sizes = {query_type: len(keywords) for query_type, keywords in self.intent_keywords.items()}
+        self._classify_cached = lru_cache(maxsize=NLP_CACHE_SIZE)(self._classify_query)
     
     def classify_query(self, user_input: str) -> Tuple[QueryType, float]:
         """Classify user query and return intent with confidence"""
+        return self._classify_cached(user_input)
+    
+    def _classify_query(self, user_input: str) -> Tuple[QueryType, float]:
+        """Uncached classification (see classify_query)"""
         try:
-            user_input_lower = user_input.lower()
-            scores = {}
-            
-            for query_type, keywords in self.intent_keywords.items():
-                score = 0
-                for keyword in keywords:
-                    if keyword in user_input_lower:
-                        score += 1
-                
-                if score > 0:
-                    scores[query_type] = score / len(keywords)
+            found = set()
+            for match in self._keyword_pattern.finditer(user_input.lower()):
+                found.update(self._keyword_index[match.group(1)])
             
-            if not scores:
+            if not found:
                 return QueryType.GENERAL_FINANCIAL, 0.5
             
-            best_match = max(scores, key=scores.get)
-            confidence = scores[best_match]
+            hits: Dict[QueryType, int] = {}
+            for _, query_type in found:
+                hits[query_type] = hits.get(query_type, 0) + 1
             
-            return best_match, confidence
+            # A single matched intent needs no ranking
+            if len(hits) == 1:
+                (query_type, count), = hits.items()
+                return query_type, count / self._type_sizes[query_type]
+            
+            # Rank in declaration order so ties resolve as before
+            scores = {
+                query_type: hits[query_type] / size
+                for query_type, size in self._type_sizes.items() if query_type in hits
+            }
+            
+            return max(scores.items(), key=itemgetter(1))
             
         except Exception as e:
             ai_logger.error(f"Query classification failed: {str(e)}")
@@ -280,28 +412,40 @@ class NLPProcessingModule:
     
     def extract_entities(self, user_input: str) -> Dict[str, Any]:
         """Extract relevant entities from user input"""
-        entities = {}
-        
-        # Extract amounts (simple regex for MVP)
-        import re
-        amount_pattern = r'\$?(\d+(?:\.\d{2})?)'
-        amounts = re.findall(amount_pattern, user_input)
-        if amounts:
-            entities['amounts'] = [float(amount) for amount in amounts]
-        
-        # Extract time periods
-        time_patterns = {
-            'month': r'\b(?:this month|last month|monthly)\b',
-            'week': r'\b(?:this week|last week|weekly)\b',
-            'year': r'\b(?:this year|last year|yearly|annual)\b'
-        }
-        
-        for period, pattern in time_patterns.items():
-            if re.search(pattern, user_input, re.IGNORECASE):
-                entities['time_period'] = period
-                break
-        
-        return entities
+        return dict(_extract_entities_cached(user_input))
+
+# Response line templates (%-formatted: one format call per line in hot loops)
+_BULLET_FMT = "• %s\n"
+_BUDGET_LINE_FMT = "• %s: $%.2f\n"
+
+# Static responses, rendered once at import
+# Simple savings advice for MVP
+_SAVINGS_RECOMMENDATIONS = (
+    "Start with an emergency fund of 3-6 months of expenses",
+    "Automate your savings to make it consistent",
+    "Look for high-yield savings accounts",
+    "Consider the 50/30/20 budgeting rule",
+    "Review and reduce unnecessary subscriptions"
+)
+_SAVINGS_RESPONSE_TEXT = (
+    "💰 **Savings Recommendations:**\n\n"
+    + "".join(f"{i}. {rec}\n" for i, rec in enumerate(_SAVINGS_RECOMMENDATIONS, 1))
+    + "\n💡 **Pro Tip:** Start small and increase your savings rate gradually as you build the habit."
+)
+
+_GENERAL_RESPONSE_TEXT = """I'm your AI financial assistant! I can help you with:
+
+📊 **Transaction Analysis** - "Show me my spending patterns"
+💰 **Budget Planning** - "Help me create a budget"
+📈 **Financial Insights** - "Give me a monthly summary"
+💡 **Savings Advice** - "How can I save more money?"
+
+What would you like to know about your finances?"""
+_GENERAL_RECOMMENDATIONS = (
+    "Try asking about your spending patterns",
+    "Ask for budget advice",
+    "Request a financial summary"
+)
 
 class UnifiedFinancialAgent:
     """
@@ -320,6 +464,14 @@ class UnifiedFinancialAgent:
         self.security_filter = get_ai_security_filter()
         self.privacy_manager = get_privacy_manager()
 
+        # Query type -> handler (anything else is answered as general financial)
+        self._handlers = {
+            QueryType.TRANSACTION_ANALYSIS: self._handle_transaction_analysis,
+            QueryType.BUDGET_ADVICE: self._handle_budget_advice,
+            QueryType.SPENDING_INSIGHTS: self._handle_spending_insights,
+            QueryType.SAVINGS_RECOMMENDATIONS: self._handle_savings_recommendations,
+        }
+
         # Agent state
         self.conversation_history = []
         self.user_context = {}
@@ -331,25 +483,25 @@ class UnifiedFinancialAgent:
         """
         Main entry point for processing user queries
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter()
+        context = context or {}
 
         try:
             # Security: Sanitize input
-            sanitized_input, input_warnings = await self.security_filter.sanitize_input(
+            sanitized_input, input_warnings = self.security_filter.sanitize_input(
                 user_input, user_id
             )
 
             # Privacy: Check if local processing is needed (consult user consent if available)
             user_id_for_privacy = user_id if user_id and user_id != "default" else None
             use_local = await self.privacy_manager.should_use_local_processing(
-                sanitized_input, context or {}, user_id=user_id_for_privacy
+                sanitized_input, context, user_id=user_id_for_privacy
             )
             
             # If local processing selected, route to local LLM adapter
-            if use_local:
+            if use_local and generate_local_response is not None:
                 try:
-                    from ..ai.local_llm import generate_local_response
-                    local_resp = await generate_local_response(sanitized_input, context or {}, user_id_for_privacy)
+                    local_resp = await generate_local_response(sanitized_input, context, user_id_for_privacy)
                     
                     # Construct AgentResponse directly from local LLM
                     response = AgentResponse(
@@ -364,7 +516,7 @@ class UnifiedFinancialAgent:
                     )
                     
                     # Filter output through security filter
-                    filtered_response, output_warnings = await self.security_filter.filter_output(
+                    filtered_response, output_warnings = self.security_filter.filter_output(
                         response.response_text, user_id
                     )
                     response.response_text = filtered_response
@@ -383,15 +535,20 @@ class UnifiedFinancialAgent:
                     # Fall through to normal processing if local LLM fails
                     pass
 
-            # Anonymize context if using cloud processing
+            # Anonymize context if using cloud processing. Handlers memoize derived
+            # data on the context, so it must be request-local: anonymization
+            # already returns a fresh dict, otherwise copy the caller's.
+            request_context = context
             if not use_local and context:
-                context = await self.privacy_manager.anonymize_context(context)
+                request_context = self.privacy_manager.anonymize_context(context)
+            if request_context is context:
+                request_context = dict(context)
 
             # Process the query
-            response = await self._process_internal(sanitized_input, context or {}, user_id)
+            response = await self._process_internal(sanitized_input, request_context, user_id)
 
             # Security: Filter output
-            filtered_response, output_warnings = await self.security_filter.filter_output(
+            filtered_response, output_warnings = self.security_filter.filter_output(
                 response.response_text, user_id
             )
 
@@ -399,7 +556,7 @@ class UnifiedFinancialAgent:
             response.response_text = filtered_response
             response.warnings.extend(input_warnings + output_warnings)
             response.local_processing = use_local
-            response.processing_time = (datetime.now() - start_time).total_seconds()
+            response.processing_time = time.perf_counter() - start_time
 
             # Log for audit
             audit_logger.log_security_event(
@@ -433,10 +590,20 @@ class UnifiedFinancialAgent:
                 data_used=[],
                 recommendations=["Please try rephrasing your question"],
                 warnings=["Processing error occurred"],
-                processing_time=(datetime.now() - start_time).total_seconds(),
+                processing_time=time.perf_counter() - start_time,
                 local_processing=True
             )
 
+    async def stream_query(self, user_input: str, context: Dict[str, Any] = None,
+                           user_id: str = "default") -> AsyncIterator[str]:
+        """
+        Process a query, yielding response text as soon as it may be released.
+        Only security-filtered text is yielded; responses are produced whole today
+        (templated modules, non-streaming local LLM call), so this is one chunk.
+        """
+        response = await self.process_query(user_input, context, user_id)
+        yield response.response_text
+
     async def _process_internal(self, user_input: str, context: Dict[str, Any],
                               user_id: str) -> AgentResponse:
         """Internal query processing logic"""
@@ -448,16 +615,8 @@ class UnifiedFinancialAgent:
         entities = self.nlp_processor.extract_entities(user_input)
 
         # Route to appropriate module based on query type
-        if query_type == QueryType.TRANSACTION_ANALYSIS:
-            result = await self._handle_transaction_analysis(user_input, context, entities)
-        elif query_type == QueryType.BUDGET_ADVICE:
-            result = await self._handle_budget_advice(user_input, context, entities)
-        elif query_type == QueryType.SPENDING_INSIGHTS:
-            result = await self._handle_spending_insights(user_input, context, entities)
-        elif query_type == QueryType.SAVINGS_RECOMMENDATIONS:
-            result = await self._handle_savings_recommendations(user_input, context, entities)
-        else:
-            result = await self._handle_general_financial(user_input, context, entities)
+        handler = self._handlers.get(query_type, self._handle_general_financial)
+        result = await handler(user_input, context, entities)
 
         return AgentResponse(
             response_text=result.get("response", "I'm here to help with your financial questions."),
@@ -473,26 +632,24 @@ class UnifiedFinancialAgent:
     async def _handle_transaction_analysis(self, user_input: str, context: Dict[str, Any],
                                          entities: Dict[str, Any]) -> Dict[str, Any]:
         """Handle transaction analysis queries"""
-        transactions = context.get("transactions", [])
+        transactions = _tx_as_arrays(context)
 
-        analysis = await self.financial_analysis.analyze_spending_patterns(
-            transactions, user_input
+        analysis = await _aggregate(
+            self.financial_analysis.analyze_spending_patterns, transactions, user_input
         )
 
-        response_text = f"{analysis['analysis']}\n\n"
+        parts = [f"{analysis['analysis']}\n\n"]
 
         if analysis['insights']:
-            response_text += "📊 **Key Insights:**\n"
-            for insight in analysis['insights']:
-                response_text += f"• {insight}\n"
+            parts.append("📊 **Key Insights:**\n")
+            parts.extend(map(_BULLET_FMT.__mod__, analysis['insights']))
 
         if analysis['recommendations']:
-            response_text += "\n💡 **Recommendations:**\n"
-            for rec in analysis['recommendations']:
-                response_text += f"• {rec}\n"
+            parts.append("\n💡 **Recommendations:**\n")
+            parts.extend(map(_BULLET_FMT.__mod__, analysis['recommendations']))
 
         return {
-            "response": response_text,
+            "response": "".join(parts),
             "data_used": ["transactions"],
             "recommendations": analysis['recommendations']
         }
@@ -511,20 +668,18 @@ class UnifiedFinancialAgent:
             income, expenses, user_input
         )
 
-        response_text = f"{advice['recommendation']}\n\n"
+        parts = [f"{advice['recommendation']}\n\n"]
 
         if advice['budget_plan']:
-            response_text += "💰 **Recommended Budget:**\n"
-            for category, amount in advice['budget_plan'].items():
-                response_text += f"• {category}: ${amount:.2f}\n"
+            parts.append("💰 **Recommended Budget:**\n")
+            parts.extend(map(_BUDGET_LINE_FMT.__mod__, advice['budget_plan'].items()))
 
         if advice['advice']:
-            response_text += "\n📋 **Budget Tips:**\n"
-            for tip in advice['advice']:
-                response_text += f"• {tip}\n"
+            parts.append("\n📋 **Budget Tips:**\n")
+            parts.extend(map(_BULLET_FMT.__mod__, advice['advice']))
 
         return {
-            "response": response_text,
+            "response": "".join(parts),
             "data_used": ["income", "expenses"],
             "recommendations": advice['advice']
         }
@@ -532,27 +687,25 @@ class UnifiedFinancialAgent:
     async def _handle_spending_insights(self, user_input: str, context: Dict[str, Any],
                                       entities: Dict[str, Any]) -> Dict[str, Any]:
         """Handle spending insights queries"""
-        transactions = context.get("transactions", [])
+        transactions = _tx_as_arrays(context)
         budget_data = context.get("budget", {})
 
-        insights = await self.insights_generator.generate_monthly_summary(
-            transactions, budget_data, user_input
+        insights = await _aggregate(
+            self.insights_generator.generate_monthly_summary, transactions, budget_data, user_input
         )
 
-        response_text = f"📈 **{insights['summary']}**\n\n"
+        parts = [f"📈 **{insights['summary']}**\n\n"]
 
         if insights['highlights']:
-            response_text += "🔍 **Highlights:**\n"
-            for highlight in insights['highlights']:
-                response_text += f"• {highlight}\n"
+            parts.append("🔍 **Highlights:**\n")
+            parts.extend(map(_BULLET_FMT.__mod__, insights['highlights']))
 
         if insights['action_items']:
-            response_text += "\n✅ **Action Items:**\n"
-            for action in insights['action_items']:
-                response_text += f"• {action}\n"
+            parts.append("\n✅ **Action Items:**\n")
+            parts.extend(map(_BULLET_FMT.__mod__, insights['action_items']))
 
         return {
-            "response": response_text,
+            "response": "".join(parts),
             "data_used": ["transactions", "budget"],
             "recommendations": insights['action_items']
         }
@@ -560,47 +713,19 @@ class UnifiedFinancialAgent:
     async def _handle_savings_recommendations(self, user_input: str, context: Dict[str, Any],
                                             entities: Dict[str, Any]) -> Dict[str, Any]:
         """Handle savings recommendation queries"""
-        # Simple savings advice for MVP
-        recommendations = [
-            "Start with an emergency fund of 3-6 months of expenses",
-            "Automate your savings to make it consistent",
-            "Look for high-yield savings accounts",
-            "Consider the 50/30/20 budgeting rule",
-            "Review and reduce unnecessary subscriptions"
-        ]
-
-        response_text = "💰 **Savings Recommendations:**\n\n"
-        for i, rec in enumerate(recommendations, 1):
-            response_text += f"{i}. {rec}\n"
-
-        response_text += "\n💡 **Pro Tip:** Start small and increase your savings rate gradually as you build the habit."
-
         return {
-            "response": response_text,
+            "response": _SAVINGS_RESPONSE_TEXT,
             "data_used": [],
-            "recommendations": recommendations
+            "recommendations": list(_SAVINGS_RECOMMENDATIONS)
         }
 
     async def _handle_general_financial(self, user_input: str, context: Dict[str, Any],
                                       entities: Dict[str, Any]) -> Dict[str, Any]:
         """Handle general financial queries"""
-        response_text = """I'm your AI financial assistant! I can help you with:
-
-📊 **Transaction Analysis** - "Show me my spending patterns"
-💰 **Budget Planning** - "Help me create a budget"
-📈 **Financial Insights** - "Give me a monthly summary"
-💡 **Savings Advice** - "How can I save more money?"
-
-What would you like to know about your finances?"""
-
         return {
-            "response": response_text,
+            "response": _GENERAL_RESPONSE_TEXT,
             "data_used": [],
-            "recommendations": [
-                "Try asking about your spending patterns",
-                "Ask for budget advice",
-                "Request a financial summary"
-            ]
+            "recommendations": list(_GENERAL_RECOMMENDATIONS)
         }
 
 # Global agent instance
@@ -6,6 +6,9 @@ Implements comprehensive security for AI interactions with financial data
 import re
 import hashlib
 import json
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import logging
@@ -13,70 +16,104 @@ import logging
 from .security import get_audit_logger, DataClassification
 from .database import db_manager, User as DBUser
 from sqlmodel import Session, select
+from sqlalchemy import update
 
 # AI security logging
 ai_security_logger = logging.getLogger("ai_security")
 audit_logger = get_audit_logger()
 
+# Patterns for detecting sensitive financial data (compiled once at import)
+_SENSITIVE_PATTERNS = (
+    # Account numbers (various formats)
+    re.compile(r'\b\d{8,17}\b'),
+    # SSN patterns
+    re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
+    # SSN / routing numbers (9 digits)
+    re.compile(r'\b\d{9}\b'),
+    # Credit card patterns
+    re.compile(r'\b(?:\d{4}[-\s]?){3}\d{4}\b'),
+    # Phone numbers
+    re.compile(r'\b\d{3}-\d{3}-\d{4}\b'),
+    re.compile(r'\(\d{3}\)\s?\d{3}-\d{4}'),
+    # Email addresses
+    re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    # Addresses (basic pattern)
+    re.compile(r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln)\b', re.IGNORECASE),
+)
+
+# Patterns for detecting prompt injection attempts
+_INJECTION_PATTERNS = (
+    # Direct instruction attempts
+    re.compile(r'ignore\s+(?:previous|all|above|prior)\s+instructions?', re.IGNORECASE),
+    re.compile(r'forget\s+(?:everything|all|previous)', re.IGNORECASE),
+    re.compile(r'new\s+instructions?:', re.IGNORECASE),
+    re.compile(r'system\s*:', re.IGNORECASE),
+    re.compile(r'assistant\s*:', re.IGNORECASE),
+    
+    # Role manipulation
+    re.compile(r'you\s+are\s+now', re.IGNORECASE),
+    re.compile(r'act\s+as\s+(?:if|a)', re.IGNORECASE),
+    re.compile(r'pretend\s+(?:to\s+be|you\s+are)', re.IGNORECASE),
+    
+    # Data extraction attempts
+    re.compile(r'show\s+me\s+(?:all|your|the)\s+(?:data|information|records)', re.IGNORECASE),
+    re.compile(r'list\s+(?:all|every)\s+(?:users?|accounts?|transactions?)', re.IGNORECASE),
+    re.compile(r'export\s+(?:all|everything)', re.IGNORECASE),
+    
+    # System manipulation
+    re.compile(r'execute\s+(?:command|code|script)', re.IGNORECASE),
+    re.compile(r'run\s+(?:command|code|script)', re.IGNORECASE),
+    re.compile(r'eval\s*\(', re.IGNORECASE),
+)
+
+# Cheap prefilters: every sensitive pattern needs a digit or "@", and every injection
+# pattern's match contains one of these lowercase literals. Non-ASCII text always
+# takes the full scan, since IGNORECASE also folds characters like U+017F to "s".
+_SENSITIVE_TRIGGER_RE = re.compile(r'[\d@]')
+_INJECTION_TRIGGERS = (
+    "instruction", "forget", ":", "you", "act", "pretend", "show", "list",
+    "export", "command", "code", "script", "("
+)
+
+def _may_contain_injection(text: str) -> bool:
+    """False only when no injection pattern can match text"""
+    if not text.isascii():
+        return True
+    lowered = text.lower()
+    return any(trigger in lowered for trigger in _INJECTION_TRIGGERS)
+
+# Financial advice that needs a disclaimer
+_ADVICE_PATTERNS = (
+    re.compile(r'you\s+should\s+(?:invest|buy|sell)', re.IGNORECASE),
+    re.compile(r'i\s+recommend\s+(?:investing|buying|selling)', re.IGNORECASE),
+    re.compile(r'guaranteed\s+(?:returns?|profit)', re.IGNORECASE),
+    re.compile(r'risk-free\s+investment', re.IGNORECASE),
+)
+
+def _fuse_patterns(patterns) -> re.Pattern:
+    """Combine patterns into one alternation (per-pattern flags kept as inline groups)"""
+    return re.compile("|".join(
+        f"(?i:{pattern.pattern})" if pattern.flags & re.IGNORECASE else f"(?:{pattern.pattern})"
+        for pattern in patterns
+    ))
+
+_SENSITIVE_UNION = _fuse_patterns(_SENSITIVE_PATTERNS)
+_INJECTION_UNION = _fuse_patterns(_INJECTION_PATTERNS)
+_ADVICE_RE = _fuse_patterns(_ADVICE_PATTERNS)
+
 class AISecurityFilter:
     """Security layer for AI interactions with financial data"""
     
     def __init__(self):
-        self.sensitive_patterns = self._load_sensitive_patterns()
-        self.prompt_injection_patterns = self._load_injection_patterns()
+        self.sensitive_patterns = _SENSITIVE_PATTERNS
+        self.prompt_injection_patterns = _INJECTION_PATTERNS
+        # Fused alternations: one scan/substitution per family instead of one per pattern
+        self._sensitive_union = _SENSITIVE_UNION
+        self._injection_union = _INJECTION_UNION
         self.max_input_length = 10000  # Maximum input length
         self.max_output_length = 50000  # Maximum output length
     
-    def _load_sensitive_patterns(self) -> List[re.Pattern]:
-        """Load patterns for detecting sensitive financial data"""
-        patterns = [
-            # Account numbers (various formats)
-            re.compile(r'\b\d{8,17}\b'),
-            # SSN patterns
-            re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
-            re.compile(r'\b\d{9}\b'),
-            # Credit card patterns
-            re.compile(r'\b(?:\d{4}[-\s]?){3}\d{4}\b'),
-            # Routing numbers
-            re.compile(r'\b\d{9}\b'),
-            # Phone numbers
-            re.compile(r'\b\d{3}-\d{3}-\d{4}\b'),
-            re.compile(r'\(\d{3}\)\s?\d{3}-\d{4}'),
-            # Email addresses
-            re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
-            # Addresses (basic pattern)
-            re.compile(r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln)\b', re.IGNORECASE),
-        ]
-        return patterns
-    
-    def _load_injection_patterns(self) -> List[re.Pattern]:
-        """Load patterns for detecting prompt injection attempts"""
-        patterns = [
-            # Direct instruction attempts
-            re.compile(r'ignore\s+(?:previous|all|above|prior)\s+instructions?', re.IGNORECASE),
-            re.compile(r'forget\s+(?:everything|all|previous)', re.IGNORECASE),
-            re.compile(r'new\s+instructions?:', re.IGNORECASE),
-            re.compile(r'system\s*:', re.IGNORECASE),
-            re.compile(r'assistant\s*:', re.IGNORECASE),
-            
-            # Role manipulation
-            re.compile(r'you\s+are\s+now', re.IGNORECASE),
-            re.compile(r'act\s+as\s+(?:if|a)', re.IGNORECASE),
-            re.compile(r'pretend\s+(?:to\s+be|you\s+are)', re.IGNORECASE),
-            
-            # Data extraction attempts
-            re.compile(r'show\s+me\s+(?:all|your|the)\s+(?:data|information|records)', re.IGNORECASE),
-            re.compile(r'list\s+(?:all|every)\s+(?:users?|accounts?|transactions?)', re.IGNORECASE),
-            re.compile(r'export\s+(?:all|everything)', re.IGNORECASE),
-            
-            # System manipulation
-            re.compile(r'execute\s+(?:command|code|script)', re.IGNORECASE),
-            re.compile(r'run\s+(?:command|code|script)', re.IGNORECASE),
-            re.compile(r'eval\s*\(', re.IGNORECASE),
-        ]
-        return patterns
-    
-    async def sanitize_input(self, user_input: str, user_id: str) -> Tuple[str, List[str]]:
+    def sanitize_input(self, user_input: str, user_id: str) -> Tuple[str, List[str]]:
         """Sanitize user input before AI processing"""
         warnings = []
         
@@ -86,25 +123,24 @@ class AISecurityFilter:
                 user_input = user_input[:self.max_input_length]
                 warnings.append("Input truncated due to length limit")
             
-            # Check for prompt injection attempts
-            injection_detected = False
-            for pattern in self.prompt_injection_patterns:
-                if pattern.search(user_input):
-                    injection_detected = True
-                    break
+            # Check for prompt injection attempts (detection and substitution in one pass)
+            filtered_count = 0
+            if _may_contain_injection(user_input):
+                sanitized, filtered_count = self._sanitize_injection_attempt(user_input)
             
-            if injection_detected:
+            if filtered_count > 0:
                 audit_logger.log_security_event(
                     event_type="PROMPT_INJECTION_DETECTED",
                     severity="WARNING",
                     details={
                         "user_id": user_id,
-                        "input_preview": user_input[:100] + "..." if len(user_input) > 100 else user_input
+                        "input_preview": user_input[:100] + "..." if len(user_input) > 100 else user_input,
+                        "filtered_patterns": filtered_count
                     }
                 )
                 warnings.append("Potential prompt injection detected")
                 # For security, we'll sanitize the input
-                user_input = self._sanitize_injection_attempt(user_input)
+                user_input = sanitized
             
             # Mask sensitive data
             sanitized_input, masked_count = self._mask_sensitive_data(user_input)
@@ -132,34 +168,31 @@ class AISecurityFilter:
             )
             raise SecurityException("Input sanitization failed")
     
-    def _sanitize_injection_attempt(self, text: str) -> str:
+    def _sanitize_injection_attempt(self, text: str) -> Tuple[str, int]:
         """Sanitize potential prompt injection attempts"""
         # Replace injection patterns with safe alternatives
-        for pattern in self.prompt_injection_patterns:
-            text = pattern.sub("[FILTERED]", text)
-        
-        return text
+        return self._injection_union.subn("[FILTERED]", text)
     
     def _mask_sensitive_data(self, text: str) -> Tuple[str, int]:
         """Mask sensitive data patterns in text"""
-        masked_count = 0
-        
-        for pattern in self.sensitive_patterns:
-            matches = pattern.findall(text)
-            if matches:
-                masked_count += len(matches)
-                text = pattern.sub("[REDACTED]", text)
-        
-        return text, masked_count
+        if _SENSITIVE_TRIGGER_RE.search(text) is None:
+            return text, 0
+        return self._sensitive_union.subn("[REDACTED]", text)
     
-    async def filter_output(self, ai_response: str, user_id: str) -> Tuple[str, List[str]]:
+    def filter_output(self, ai_response: str, user_id: str) -> Tuple[str, List[str]]:
         """Filter AI response for data leakage and inappropriate content"""
         warnings = []
         
         try:
+            # Output is spliced together once at the end: the truncation marker and
+            # disclaimer contain nothing either scan can match, so they are appended
+            # after scanning instead of being concatenated into intermediate copies
+            suffix = []
+            
             # Check output length
             if len(ai_response) > self.max_output_length:
-                ai_response = ai_response[:self.max_output_length] + "\n[Response truncated]"
+                ai_response = ai_response[:self.max_output_length]
+                suffix.append("\n[Response truncated]")
                 warnings.append("Response truncated due to length limit")
             
             # Check for sensitive data leakage
@@ -179,7 +212,10 @@ class AISecurityFilter:
             # Check for inappropriate financial advice
             if self._contains_inappropriate_advice(filtered_response):
                 warnings.append("Response contains disclaimer about financial advice")
-                filtered_response += "\n\n⚠️ This is for informational purposes only and should not be considered professional financial advice."
+                suffix.append("\n\n⚠️ This is for informational purposes only and should not be considered professional financial advice.")
+            
+            if suffix:
+                filtered_response = "".join([filtered_response, *suffix])
             
             ai_security_logger.info(f"Output filtered for user {user_id}: {len(warnings)} warnings")
             return filtered_response, warnings
@@ -195,18 +231,22 @@ class AISecurityFilter:
     
     def _contains_inappropriate_advice(self, text: str) -> bool:
         """Check if response contains financial advice that needs disclaimers"""
-        advice_patterns = [
-            re.compile(r'you\s+should\s+(?:invest|buy|sell)', re.IGNORECASE),
-            re.compile(r'i\s+recommend\s+(?:investing|buying|selling)', re.IGNORECASE),
-            re.compile(r'guaranteed\s+(?:returns?|profit)', re.IGNORECASE),
-            re.compile(r'risk-free\s+investment', re.IGNORECASE),
-        ]
-        
-        for pattern in advice_patterns:
-            if pattern.search(text):
-                return True
-        
-        return False
+        return _ADVICE_RE.search(text) is not None
+
+# Consent flags are re-read from the DB at most once per TTL per user
+CONSENT_CACHE_TTL = 60  # seconds
+CONSENT_CACHE_SIZE = 10_000
+
+# Transaction fields kept (column-wise) when transaction data is anonymized
+_ANONYMIZED_TRANSACTION_FIELDS = ('amount', 'category', 'date', 'type')
+
+# Marks context keys that pass through anonymize_context unchanged
+_KEEP = object()
+
+@lru_cache(maxsize=4096)
+def _hash_id(identifier: str) -> str:
+    """Truncated SHA-256 of an identifier (memoized; the same IDs recur per conversation)"""
+    return hashlib.sha256(identifier.encode()).hexdigest()[:16]
 
 class PrivacyManager:
     """Manages privacy-preserving AI processing"""
@@ -214,6 +254,71 @@ class PrivacyManager:
     def __init__(self):
         self.local_processing_threshold = 0.8  # Sensitivity threshold for local processing
         self.anonymization_enabled = True
+        
+        # Sensitive keywords, each adding keyword_weight once when present
+        self.sensitive_keywords = [
+            'account', 'balance', 'income', 'salary', 'debt', 'loan',
+            'credit', 'ssn', 'social security', 'tax', 'investment'
+        ]
+        self.keyword_weight = 0.2
+        # All keywords matched in one scan; the lookahead reports overlapping hits.
+        # The leading first-character class skips positions no keyword can start at.
+        first_chars = "".join(sorted({keyword[0] for keyword in self.sensitive_keywords}))
+        self._keyword_pattern = re.compile("(?=[%s])(?=(%s))" % (
+            re.escape(first_chars),
+            "|".join(map(re.escape, sorted(self.sensitive_keywords, key=len, reverse=True)))
+        ))
+        # Context key -> anonymizer; None drops the key, unlisted keys pass through
+        self._anonymizers = {
+            'user_id': self._hash_identifier,
+            'account_id': self._hash_identifier,
+            'transaction_id': self._hash_identifier,
+            'transaction_data': self._anonymize_transactions,
+            'personal_info': None,
+        }
+        # user_id -> (ai_data_consent or None if unknown, monotonic expiry)
+        self._consent_cache: "OrderedDict[str, Tuple[Optional[bool], float]]" = OrderedDict()
+    
+    def _get_consent(self, user_id: str) -> Optional[bool]:
+        """Read a user's AI data consent flag, cached for CONSENT_CACHE_TTL seconds"""
+        now = time.monotonic()
+        cached = self._consent_cache.get(user_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        
+        session: Session = db_manager.get_read_session()
+        try:
+            consent = session.exec(
+                select(DBUser.ai_data_consent).where(DBUser.id == user_id).limit(1)
+            ).first()
+        finally:
+            session.close()
+        
+        self._consent_cache.pop(user_id, None)
+        if len(self._consent_cache) >= CONSENT_CACHE_SIZE:
+            self._consent_cache.popitem(last=False)
+        self._consent_cache[user_id] = (consent, now + CONSENT_CACHE_TTL)
+        return consent
+    
+    def invalidate_consent(self, user_id: str) -> None:
+        """Drop a cached consent flag (call after the user changes their settings)"""
+        self._consent_cache.pop(user_id, None)
+    
+    def set_ai_data_consent(self, user_id: str, consent: bool) -> None:
+        """Store a user's AI data consent flag; takes effect on their next query"""
+        session: Session = db_manager.get_session()
+        try:
+            session.execute(update(DBUser).where(DBUser.id == user_id).values(ai_data_consent=consent))
+            session.commit()
+        finally:
+            session.close()
+        self.invalidate_consent(user_id)
+        
+        audit_logger.log_security_event(
+            event_type="AI_DATA_CONSENT_CHANGED",
+            severity="INFO",
+            details={"user_id": user_id, "consent": consent}
+        )
     
     async def should_use_local_processing(self, user_input: str, context: Dict[str, Any], user_id: Optional[str] = None) -> bool:
         """Determine if query should be processed locally for privacy
@@ -227,18 +332,13 @@ class PrivacyManager:
             # Check user consent (if available)
             if user_id:
                 try:
-                    session: Session = db_manager.get_session()
-                    db_user = session.exec(select(DBUser).where(DBUser.id == user_id)).one_or_none()
-                    session.close()
-                    if db_user is not None:
-                        consent = getattr(db_user, "ai_data_consent", True)
-                        if consent is False:
-                            audit_logger.log_security_event(
-                                event_type="LOCAL_PROCESSING_FORCED_BY_CONSENT",
-                                severity="INFO",
-                                details={"user_id": user_id}
-                            )
-                            return True
+                    if self._get_consent(user_id) is False:
+                        audit_logger.log_security_event(
+                            event_type="LOCAL_PROCESSING_FORCED_BY_CONSENT",
+                            severity="INFO",
+                            details={"user_id": user_id}
+                        )
+                        return True
                 except Exception as e:
                     ai_security_logger.debug(f"Unable to read user consent from DB: {e}")
             
@@ -269,16 +369,15 @@ class PrivacyManager:
         """Calculate sensitivity score for privacy decision"""
         score = 0.0
         
-        # Check for sensitive keywords
-        sensitive_keywords = [
-            'account', 'balance', 'income', 'salary', 'debt', 'loan',
-            'credit', 'ssn', 'social security', 'tax', 'investment'
-        ]
-        
-        input_lower = user_input.lower()
-        for keyword in sensitive_keywords:
-            if keyword in input_lower:
-                score += 0.2
+        # Check for sensitive keywords (single pass; stop once the cap is reached).
+        # Lowercasing first is deliberate: the lowered copy is bounded by
+        # max_input_length, while an IGNORECASE scan of the original runs ~2x slower.
+        found = set()
+        for match in self._keyword_pattern.finditer(user_input.lower()):
+            found.add(match.group(1))
+            if len(found) * self.keyword_weight >= 1.0:
+                break
+        score += len(found) * self.keyword_weight
         
         # Check context for sensitive data
         if context:
@@ -291,32 +390,35 @@ class PrivacyManager:
         
         return min(score, 1.0)  # Cap at 1.0
     
-    async def anonymize_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    def anonymize_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Anonymize context data for cloud processing"""
         if not self.anonymization_enabled:
             return context
         
         try:
             anonymized_context = {}
+            dropped_keys = []
+            anonymizers = self._anonymizers
             
             for key, value in context.items():
-                if key in ['user_id', 'account_id', 'transaction_id']:
-                    # Hash identifiers
-                    anonymized_context[key] = self._hash_identifier(str(value))
-                elif key == 'transaction_data':
-                    # Anonymize transaction data
-                    anonymized_context[key] = self._anonymize_transactions(value)
-                elif key == 'personal_info':
-                    # Skip personal info entirely
-                    continue
-                else:
+                anonymizer = anonymizers.get(key, _KEEP)
+                if anonymizer is _KEEP:
                     # Keep other context as-is
                     anonymized_context[key] = value
+                elif anonymizer is None:
+                    # Skip personal info entirely
+                    dropped_keys.append(key)
+                else:
+                    anonymized_context[key] = anonymizer(value)
             
             audit_logger.log_security_event(
                 event_type="CONTEXT_ANONYMIZED",
                 severity="INFO",
-                details={"original_keys": list(context.keys()), "anonymized_keys": list(anonymized_context.keys())}
+                details={
+                    "original_key_count": len(context),
+                    "anonymized_key_count": len(anonymized_context),
+                    "dropped_keys": dropped_keys
+                }
             )
             
             return anonymized_context
@@ -326,25 +428,17 @@ class PrivacyManager:
             # Return empty context for safety
             return {}
     
-    def _hash_identifier(self, identifier: str) -> str:
+    def _hash_identifier(self, identifier: Any) -> str:
         """Hash identifier for anonymization"""
-        return hashlib.sha256(identifier.encode()).hexdigest()[:16]
+        return _hash_id(str(identifier))
     
-    def _anonymize_transactions(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Anonymize transaction data"""
-        anonymized = []
-        
-        for transaction in transactions:
-            anon_transaction = {
-                'amount': transaction.get('amount'),
-                'category': transaction.get('category'),
-                'date': transaction.get('date'),
-                'type': transaction.get('type')
-            }
-            # Remove description and other identifying info
-            anonymized.append(anon_transaction)
-        
-        return anonymized
+    def _anonymize_transactions(self, transactions: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Anonymize transaction data into columns: {field: [value per transaction]}"""
+        # Only the whitelisted fields survive; descriptions and other identifying info are dropped
+        return {
+            field: [transaction.get(field) for transaction in transactions]
+            for field in _ANONYMIZED_TRANSACTION_FIELDS
+        }
 
 class SecurityException(Exception):
     """Custom exception for AI security-related errors"""
@@ -7,6 +7,10 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, Dict, Any
 from datetime import datetime
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+import threading
 import uuid
 
 from .security import (
@@ -14,14 +18,93 @@ from .security import (
     SecurityAuditLogger,
     get_auth_manager,
     get_audit_logger,
-    SecurityException
+    SecurityException,
+    ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from sqlmodel import Session, select
+from sqlalchemy import update, bindparam
 from .database import db_manager, User as DBUser
 
 # Security scheme for FastAPI
 security_scheme = HTTPBearer()
 
+# Columns the User wrapper needs, loaded once per session (built once at import)
+_SELECT_SESSION_USER_STMT = (
+    select(DBUser.id, DBUser.pin_hash, DBUser.device_id, DBUser.preferences, DBUser.is_active)
+    .where(DBUser.id == bindparam("uid"))
+    .limit(1)
+)
+
+# Session bounds: a session lives as long as its access token
+SESSION_TTL_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+MAX_SESSIONS = 100_000
+
+@dataclass(slots=True)
+class SessionInfo:
+    """Server-side session record (monotonic timestamps)"""
+    user_id: str
+    device_id: Optional[str]
+    created_at: float
+    last_activity: float
+    user: Optional["User"] = None  # resolved on first token check, dropped by SessionStore.forget_user
+
+class SessionStore:
+    """
+    Bounded session map with a fixed time-to-live.
+
+    Entries are kept in creation order, so expired sessions are always at the
+    front and are dropped lazily on insert; the oldest session is evicted once
+    maxsize is reached. Mutations take a lock (handlers may run on worker
+    threads); lookups are plain dict reads and stay lock-free.
+    """
+
+    def __init__(self, maxsize: int = MAX_SESSIONS, ttl: float = SESSION_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, SessionInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        entries = self._entries
+        while entries:
+            info = next(iter(entries.values()))
+            if now - info.created_at < self.ttl:
+                break
+            entries.popitem(last=False)
+
+    def get(self, session_id: str) -> Optional[SessionInfo]:
+        """Return a live session, dropping it if it has expired"""
+        info = self._entries.get(session_id)
+        if info is not None and time.monotonic() - info.created_at >= self.ttl:
+            with self._lock:
+                self._entries.pop(session_id, None)
+            return None
+        return info
+
+    def __setitem__(self, session_id: str, info: SessionInfo) -> None:
+        with self._lock:
+            self._expire(info.created_at)
+            if len(self._entries) >= self.maxsize:
+                self._entries.popitem(last=False)
+            self._entries[session_id] = info
+
+    def pop(self, session_id: str) -> Optional[SessionInfo]:
+        with self._lock:
+            return self._entries.pop(session_id, None)
+
+    def forget_user(self, user_id: str) -> None:
+        """Drop the cached User from every session of user_id (reloaded on next use)"""
+        with self._lock:
+            for info in self._entries.values():
+                if info.user_id == user_id:
+                    info.user = None
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 class User:
     """Lightweight User wrapper for compatibility with existing code.
     When a database-backed user exists, we wrap DBUser into this structure.
@@ -51,7 +134,7 @@ class AuthService:
     def __init__(self):
         self.auth_manager = get_auth_manager()
         self.audit_logger = get_audit_logger()
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.sessions = SessionStore()
     
     def create_user(self, pin: str, device_id: str = None, 
                    preferences: Dict[str, Any] = None) -> User:
@@ -61,10 +144,10 @@ class AuthService:
             pin_hash = self.auth_manager.hash_pin(pin)
             db_user = DBUser(pin_hash=pin_hash, device_id=device_id, preferences=preferences or {})
             session.add(db_user)
-            session.commit()
-            session.refresh(db_user)
-            
+            # Every field the wrapper needs is set client-side (id included), so it is
+            # built before the commit expires the instance; no reload SELECT
             user = _dbuser_to_user(db_user)
+            session.commit()
             
             self.audit_logger.log_authentication_event(
                 user_id=user.id,
@@ -90,13 +173,10 @@ class AuthService:
         session: Session = db_manager.get_session()
         try:
             # If no users exist, create one (MVP)
-            result = session.exec(select(DBUser))
-            first = result.first()
-            if not first:
+            db_user = session.exec(select(DBUser).limit(1)).first()
+            if not db_user:
                 return self.create_user(pin=pin, device_id=device_id)
             
-            db_user = first
-            
             # Check account lockout
             if self.auth_manager.check_account_lockout(str(db_user.id)):
                 self.audit_logger.log_authentication_event(
@@ -111,7 +191,8 @@ class AuthService:
                 )
             
             # Verify PIN
-            if not self.auth_manager.verify_pin(pin, db_user.pin_hash):
+            valid, new_pin_hash = self.auth_manager.verify_and_update_pin(pin, db_user.pin_hash)
+            if not valid:
                 self.auth_manager.record_failed_attempt(str(db_user.id))
                 self.audit_logger.log_authentication_event(
                     user_id=str(db_user.id),
@@ -123,19 +204,22 @@ class AuthService:
             
             # Successful authentication
             self.auth_manager.reset_failed_attempts(str(db_user.id))
-            db_user.last_login = datetime.utcnow()
-            session.add(db_user)
+            user = _dbuser_to_user(db_user)
+            values = {"last_login": datetime.utcnow()}
+            if new_pin_hash:
+                # Rehashed under the preferred scheme (e.g. bcrypt -> argon2id)
+                values["pin_hash"] = new_pin_hash
+            session.execute(update(DBUser).where(DBUser.id == db_user.id).values(**values))
             session.commit()
-            session.refresh(db_user)
             
             self.audit_logger.log_authentication_event(
-                user_id=str(db_user.id),
+                user_id=user.id,
                 event_type="LOGIN_SUCCESS",
                 success=True,
                 details={"device_id": device_id}
             )
             
-            return _dbuser_to_user(db_user)
+            return user
         finally:
             session.close()
     
@@ -155,12 +239,13 @@ class AuthService:
             
             # Store session
             session_id = token_data["session_id"]
-            self.sessions[session_id] = {
-                "user_id": user.id,
-                "device_id": device_id,
-                "created_at": datetime.utcnow(),
-                "last_activity": datetime.utcnow()
-            }
+            now = time.monotonic()
+            self.sessions[session_id] = SessionInfo(
+                user_id=user.id,
+                device_id=device_id,
+                created_at=now,
+                last_activity=now
+            )
             
             self.audit_logger.log_authentication_event(
                 user_id=user.id,
@@ -185,7 +270,14 @@ class AuthService:
             raise SecurityException("Session creation failed")
     
     def get_user_from_token(self, token: str) -> Optional[User]:
-        """Get user from JWT token"""
+        """
+        Get user from JWT token.
+
+        The user row is read once per session and cached on it. set_user_active
+        and logout_user drop that cache; any other change to the row (e.g. a
+        direct database edit) is not seen until the session expires, which can
+        take up to SESSION_TTL_SECONDS.
+        """
         try:
             payload = self.auth_manager.verify_token(token)
             if not payload:
@@ -195,7 +287,8 @@ class AuthService:
             session_id = payload.get("session_id")
             
             # Check if session exists and is valid
-            if session_id not in self.sessions:
+            session_info = self.sessions.get(session_id)
+            if session_info is None:
                 self.audit_logger.log_authentication_event(
                     user_id=user_id,
                     event_type="INVALID_SESSION",
@@ -205,18 +298,29 @@ class AuthService:
                 return None
             
             # Update session activity
-            self.sessions[session_id]["last_activity"] = datetime.utcnow()
+            session_info.last_activity = time.monotonic()
+            
+            if session_info.user is not None:
+                return session_info.user
             
             # Get user from DB
-            session = db_manager.get_session()
+            session = db_manager.get_read_session()
             try:
-                db_user = session.exec(select(DBUser).where(DBUser.id == user_id)).one_or_none()
-                if not db_user or not db_user.is_active:
-                    return None
-                return _dbuser_to_user(db_user)
+                row = session.execute(_SELECT_SESSION_USER_STMT, {"uid": user_id}).one_or_none()
             finally:
                 session.close()
             
+            if row is None or not row.is_active:
+                return None
+            session_info.user = User(
+                user_id=str(row.id),
+                pin_hash=row.pin_hash,
+                device_id=row.device_id,
+                preferences=row.preferences or {},
+                is_active=row.is_active
+            )
+            return session_info.user
+            
         except Exception as e:
             self.audit_logger.log_security_event(
                 event_type="TOKEN_VERIFICATION_FAILED",
@@ -225,11 +329,27 @@ class AuthService:
             )
             return None
     
+    def set_user_active(self, user_id: str, is_active: bool) -> None:
+        """Activate or deactivate a user; takes effect on their next request"""
+        session: Session = db_manager.get_session()
+        try:
+            session.execute(update(DBUser).where(DBUser.id == user_id).values(is_active=is_active))
+            session.commit()
+        finally:
+            session.close()
+        self.sessions.forget_user(user_id)
+        
+        self.audit_logger.log_authentication_event(
+            user_id=user_id,
+            event_type="USER_ACTIVATED" if is_active else "USER_DEACTIVATED",
+            success=True
+        )
+    
     def logout_user(self, session_id: str, user_id: str) -> None:
         """Logout user and invalidate session"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            
+        # The user's other sessions reload the user row on their next request
+        self.sessions.forget_user(user_id)
+        if self.sessions.pop(session_id) is not None:
             self.audit_logger.log_authentication_event(
                 user_id=user_id,
                 event_type="LOGOUT",
@@ -245,10 +365,15 @@ def get_auth_service() -> AuthService:
     return auth_service
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
     auth_svc: AuthService = Depends(get_auth_service)
 ) -> User:
     """FastAPI dependency to get current authenticated user"""
+    # Resolved at most once per request; later callers reuse request.state.user
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
     
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -263,6 +388,7 @@ async def get_current_user(
         if user is None:
             raise credentials_exception
             
+        request.state.user = user
         return user
         
     except Exception:
@@ -281,40 +407,46 @@ async def get_current_active_user(
 
 # Rate limiting middleware
 class RateLimitMiddleware:
-    """Rate limiting middleware for API protection"""
+    """Rate limiting middleware for API protection (per-IP token bucket)
+
+    State is per process, which matches how the API is served (a single
+    uvicorn worker); a multi-worker deployment would need a shared store.
+    """
     
     def __init__(self):
-        self.requests: Dict[str, list] = {}
+        self.requests: "OrderedDict[str, tuple]" = OrderedDict()
         self.max_requests = 100  # requests per minute
         self.window_size = 60  # seconds
+        self.max_clients = 50_000
+        self.refill_rate = self.max_requests / self.window_size
     
     def is_rate_limited(self, client_ip: str) -> bool:
         """Check if client is rate limited"""
-        now = datetime.utcnow().timestamp()
-        
-        if client_ip not in self.requests:
-            self.requests[client_ip] = []
+        now = time.monotonic()
         
-        # Remove old requests outside the window
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip]
-            if now - req_time < self.window_size
-        ]
+        # Refill the bucket for the time elapsed since the last request
+        bucket = self.requests.pop(client_ip, None)
+        if bucket is None:
+            tokens = self.max_requests
+            if len(self.requests) >= self.max_clients:
+                self.requests.popitem(last=False)
+        else:
+            tokens, last = bucket
+            tokens = min(self.max_requests, tokens + (now - last) * self.refill_rate)
         
         # Check if limit exceeded
-        if len(self.requests[client_ip]) >= self.max_requests:
-            return True
-        
-        # Add current request
-        self.requests[client_ip].append(now)
-        return False
+        limited = tokens < 1
+        if not limited:
+            tokens -= 1
+        self.requests[client_ip] = (tokens, now)
+        return limited
 
 # Global rate limiter
 rate_limiter = RateLimitMiddleware()
 
 async def check_rate_limit(request: Request):
     """FastAPI dependency for rate limiting"""
-    client_ip = request.client.host
+    client_ip = request.client.host if request.client else "unknown"
     
     if rate_limiter.is_rate_limited(client_ip):
         raise HTTPException(
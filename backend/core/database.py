@@ -4,7 +4,10 @@ Implements SQLCipher for encrypted financial data storage
 """
 
 import os
+import json
+import hashlib
 import sqlite3
+from urllib.parse import quote_plus
 from typing import Optional, Dict, Any
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
@@ -12,19 +15,45 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime, date
 from uuid import UUID, uuid4
 
-from sqlalchemy import create_engine, event, Column, Boolean, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import create_engine, event, Column, Boolean, Integer, String, DateTime, ForeignKey, JSON, Index, LargeBinary
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy import insert, delete, select, bindparam, text, func, tuple_, Date, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, QueuePool
 import logging
 
 from sqlmodel import Field, SQLModel, Relationship
+from sqlmodel import Session as SQLModelSession
 
 from .security import get_audit_logger, DataClassification
 
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to stdlib json
+    orjson = None
+
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./budget_assistant.db")
 ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", "change_this_in_production")
+# SQLCipher wipes/locks every freed allocation while memory security is on, which
+# roughly halves read throughput; SQLCIPHER_MEMORY_SECURITY=off trades that away
+SQLCIPHER_MEMORY_SECURITY = os.getenv("SQLCIPHER_MEMORY_SECURITY", "on").lower() != "off"
+# SQLCipher key derivation (must match the kdf pragmas below)
+SQLCIPHER_KDF_ITER = 64000
+SQLCIPHER_SALT_SIZE = 16
+
+# Connection pools (file databases): SQLite allows one writer at a time, so the
+# write pool stays small while reads get a connection per core
+READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", os.cpu_count() or 4))
+WRITE_POOL_SIZE = int(os.getenv("DB_WRITE_POOL_SIZE", "1"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "4"))
+POOL_RECYCLE_SECONDS = 3600
+# Compiled-statement cache entries per engine (SQLAlchemy default is 500)
+QUERY_CACHE_SIZE = 1200
+# PRAGMA integrity_check reads every page (slow on encrypted databases), so
+# startup only runs it when DB_CHECK_INTEGRITY=on
+DB_CHECK_INTEGRITY = os.getenv("DB_CHECK_INTEGRITY", "off").lower() == "on"
 
 # SQLAlchemy setup
 Base = declarative_base()
@@ -40,15 +69,128 @@ class SQLModelBase(SQLModel):
     class Config:
         arbitrary_types_allowed = True
 
+class UUIDBinary(TypeDecorator):
+    """UUID stored as 16 raw bytes (SQLite would otherwise keep 32 hex characters)"""
+    impl = LargeBinary(16)
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, UUID):
+            value = UUID(str(value))
+        return value.bytes
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # Rows not yet converted by convert_legacy_uuid_columns hold 32-char hex TEXT
+        return UUID(value) if isinstance(value, str) else UUID(bytes=value)
+
+# Id/FK columns that moved from the old hex TEXT GUIDs to UUIDBinary
+_UUID_COLUMNS = (
+    ("users", ("id",)),
+    ("conversations", ("id", "user_id")),
+    ("messages", ("id", "conversation_id")),
+)
+
+def convert_legacy_uuid_columns(connection) -> int:
+    """Rewrite 32-char hex TEXT ids as 16 raw bytes (idempotent); returns values converted"""
+    if connection.dialect.name != "sqlite":
+        return 0
+    tables = set(inspect(connection).get_table_names())
+    # Parent and child keys are rewritten one statement at a time
+    connection.exec_driver_sql("PRAGMA defer_foreign_keys = ON")
+    converted = 0
+    for table, columns in _UUID_COLUMNS:
+        if table not in tables:
+            continue
+        for column in columns:
+            legacy = connection.execute(text(
+                f"SELECT DISTINCT {column} FROM {table} WHERE typeof({column}) = 'text'"
+            )).scalars().all()
+            if legacy:
+                connection.execute(
+                    text(f"UPDATE {table} SET {column} = :new WHERE {column} = :old"),
+                    [{"new": UUID(value).bytes, "old": value} for value in legacy]
+                )
+                converted += len(legacy)
+    return converted
+
+def convert_legacy_message_content(connection) -> int:
+    """Store old base64 TEXT message contents as BLOBs (idempotent); returns rows converted"""
+    if connection.dialect.name != "sqlite" or not inspect(connection).has_table("messages"):
+        return 0
+    return connection.execute(text(
+        "UPDATE messages SET content = CAST(content AS BLOB) WHERE typeof(content) = 'text'"
+    )).rowcount
+
+def ensure_indexes(connection) -> int:
+    """Create model indexes missing from existing tables (idempotent); returns indexes created"""
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    created = 0
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+                created += 1
+    return created
+
+class BinaryContent(TypeDecorator):
+    """Raw bytes; legacy TEXT values (base64 Fernet tokens) are read back as their ASCII bytes"""
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_result_value(self, value, dialect):
+        return value.encode() if isinstance(value, str) else value
+
+def _json_serializer(value: Any) -> str:
+    """Engine-level serializer for plain JSON columns"""
+    if orjson is not None:
+        return orjson.dumps(value, default=str).decode()
+    return json.dumps(value, default=str)
+
+def _json_deserializer(value: Any) -> Any:
+    return orjson.loads(value) if orjson is not None else json.loads(value)
+
+class CompactJSON(TypeDecorator):
+    """JSON stored as compact UTF-8 bytes (orjson when available)"""
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if orjson is not None:
+            return orjson.dumps(value, default=str)
+        return json.dumps(value, separators=(",", ":"), default=str).encode()
+    
+    def process_result_value(self, value, dialect):
+        # Rows written by the old JSON (TEXT) column come back as str
+        return None if value is None else _json_deserializer(value)
+
+def _created_at_column() -> Column:
+    """Creation timestamp (UTC); the server default covers rows written outside the ORM"""
+    # Also set client-side: tables created before the server default existed
+    # (create_all never alters them) have NOT NULL and no default
+    return Column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.now())
+
+# Relationships never lazy-load: touching one that wasn't eager-loaded (e.g. with
+# selectinload) raises instead of silently issuing a query per row
+
 # Define User model (SQLAlchemy ORM compatible with SQLModel)
 class User(SQLModelBase, table=True):
     __tablename__ = "users"
 
-    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    id: Optional[UUID] = Field(default_factory=uuid4, sa_column=Column(UUIDBinary, primary_key=True))
     pin_hash: str = Field(index=True)
     device_id: Optional[str] = Field(default=None)
-    preferences: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON)) # Store as JSON
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    preferences: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(CompactJSON)) # Compact JSON bytes
+    created_at: Optional[datetime] = Field(default=None, sa_column=_created_at_column())
     last_login: Optional[datetime] = Field(default=None)
     is_active: bool = Field(default=True)
 
@@ -56,32 +198,126 @@ class User(SQLModelBase, table=True):
     ai_data_consent: bool = Field(default=True, description="User consent for AI data processing")
     ai_data_retention_days: int = Field(default=30, description="Number of days to retain AI conversation data")
 
-    conversations: List["Conversation"] = Relationship(back_populates="user")
+    conversations: List["Conversation"] = Relationship(back_populates="user", sa_relationship_kwargs={"lazy": "raise"})
 
 # Define Conversation model
 class Conversation(SQLModelBase, table=True):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Per-user listing ordered by recency
+        Index("ix_conv_user_updated", "user_id", "updated_at"),
+    )
 
-    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
-    user_id: UUID = Field(foreign_key="users.id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-    retention_until: Optional[date] = Field(default=None, description="Date until conversation data should be retained")
+    id: Optional[UUID] = Field(default_factory=uuid4, sa_column=Column(UUIDBinary, primary_key=True))
+    user_id: UUID = Field(sa_column=Column(UUIDBinary, ForeignKey("users.id"), nullable=False))
+    created_at: Optional[datetime] = Field(default=None, sa_column=_created_at_column())
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, default=datetime.utcnow,
+                         server_default=func.now(), onupdate=datetime.utcnow)
+    )
+    retention_until: Optional[date] = Field(default=None, index=True, description="Date until conversation data should be retained")
 
-    user: User = Relationship(back_populates="conversations")
-    messages: List["Message"] = Relationship(back_populates="conversation")
+    user: User = Relationship(back_populates="conversations", sa_relationship_kwargs={"lazy": "raise"})
+    messages: List["Message"] = Relationship(back_populates="conversation", sa_relationship_kwargs={"lazy": "raise"})
 
 # Define Message model
 class Message(SQLModelBase, table=True):
     __tablename__ = "messages"
+    __table_args__ = (
+        # A conversation's messages in timestamp order
+        Index("ix_msg_conv_ts", "conversation_id", "timestamp"),
+    )
 
-    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
-    conversation_id: UUID = Field(foreign_key="conversations.id")
+    id: Optional[UUID] = Field(default_factory=uuid4, sa_column=Column(UUIDBinary, primary_key=True))
+    conversation_id: UUID = Field(sa_column=Column(UUIDBinary, ForeignKey("conversations.id"), nullable=False))
     sender: str = Field(description="Sender of the message (user or AI)")
-    content: str = Field(description="Encrypted content of the message") # Will be encrypted
+    content: bytes = Field(sa_column=Column(BinaryContent, nullable=False), description="Encrypted content of the message (raw bytes)")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
-    conversation: Conversation = Relationship(back_populates="messages")
+    conversation: Conversation = Relationship(back_populates="messages", sa_relationship_kwargs={"lazy": "raise"})
+
+# Canned statements for the hot conversation queries. Built once at import with
+# bind parameters, so every call hits the engine's compiled cache; run them with
+# session.execute(stmt, {...}). Read-only listings select plain column rows
+# (no ORM objects or identity-map bookkeeping); the rest return entities (.scalars())
+SELECT_CONVERSATION_STMT = select(Conversation).where(
+    Conversation.id == bindparam("cid"), Conversation.user_id == bindparam("uid")
+)
+SELECT_MESSAGES_STMT = (
+    select(Message.id, Message.sender, Message.content, Message.timestamp)
+    .where(Message.conversation_id == bindparam("cid"))
+    .order_by(Message.timestamp)
+)
+_CONVERSATION_LIST_COLUMNS = (
+    Conversation.id, Conversation.user_id, Conversation.created_at,
+    Conversation.updated_at, Conversation.retention_until
+)
+SELECT_CONVERSATIONS_STMT = (
+    select(*_CONVERSATION_LIST_COLUMNS)
+    .where(Conversation.user_id == bindparam("uid"))
+    .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+    .limit(bindparam("limit"))
+    .offset(bindparam("offset"))
+)
+# Keyset page: conversations after the (updated_at, id) of the previous page's last row
+SELECT_CONVERSATIONS_AFTER_STMT = (
+    select(*_CONVERSATION_LIST_COLUMNS)
+    .where(
+        Conversation.user_id == bindparam("uid"),
+        tuple_(Conversation.updated_at, Conversation.id)
+        < tuple_(bindparam("updated_at", type_=DateTime), bindparam("cid", type_=UUIDBinary))
+    )
+    .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+    .limit(bindparam("limit"))
+)
+SELECT_CONVERSATION_UPDATED_AT_STMT = select(Conversation.updated_at).where(
+    Conversation.id == bindparam("cid"), Conversation.user_id == bindparam("uid")
+)
+SELECT_USER_RETENTION_DAYS_STMT = select(User.ai_data_retention_days).where(User.id == bindparam("uid"))
+
+# Set-based deletes (messages first); nothing is loaded, so there is no session state to sync
+_OWNED_CONVERSATION = (Conversation.id == bindparam("cid"), Conversation.user_id == bindparam("uid"))
+_EXPIRED_CONVERSATION = Conversation.retention_until < bindparam("today", type_=Date)
+DELETE_CONVERSATION_MESSAGES_STMT = delete(Message).where(
+    Message.conversation_id.in_(select(Conversation.id).where(*_OWNED_CONVERSATION))
+).execution_options(synchronize_session=False)
+DELETE_CONVERSATION_STMT = delete(Conversation).where(
+    *_OWNED_CONVERSATION
+).execution_options(synchronize_session=False)
+DELETE_EXPIRED_MESSAGES_STMT = delete(Message).where(
+    Message.conversation_id.in_(select(Conversation.id).where(_EXPIRED_CONVERSATION))
+).execution_options(synchronize_session=False)
+DELETE_EXPIRED_CONVERSATIONS_STMT = delete(Conversation).where(
+    _EXPIRED_CONVERSATION
+).execution_options(synchronize_session=False)
+
+# Liveness probe, built once and run on a pooled reader connection
+_HEALTH_CHECK_STMT = text("SELECT 1")
+_INTEGRITY_CHECK_STMT = text("PRAGMA integrity_check")
+
+# Journal/cache tuning applied to every connection. WAL lets readers proceed
+# while a write is in progress; synchronous=NORMAL is durable under WAL except
+# for the last commits on power loss (never corruption).
+_PERFORMANCE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA wal_autocheckpoint=4000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256MB
+    "PRAGMA cache_size=-65536",  # 64MB
+    "PRAGMA busy_timeout=5000",
+)
+
+def _apply_performance_pragmas(cursor) -> None:
+    for pragma in _PERFORMANCE_PRAGMAS:
+        cursor.execute(pragma)
+
+def _set_query_only(dbapi_connection, connection_record):
+    """Make reader-pool connections refuse writes"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
 
 class DatabaseManager:
     """Manages database connections and encryption"""
@@ -89,6 +325,8 @@ class DatabaseManager:
     def __init__(self):
         self.engine = None
         self.session_factory = None
+        self.read_engine = None
+        self.read_session_factory = None
         self.is_encrypted = False
     
     def initialize_database(self, encryption_key: Optional[str] = None) -> None:
@@ -107,27 +345,51 @@ class DatabaseManager:
                 self.is_encrypted = False
                 db_logger.warning("Initializing unencrypted database - not recommended for production")
             
-            # Create engine
-            self.engine = create_engine(
-                database_url,
-                connect_args={
-                    "check_same_thread": False,
-                    "timeout": 30
-                },
-                poolclass=StaticPool,
-                echo=False  # Set to True for SQL debugging
-            )
+            # Create engines (writer, plus a read-only reader pool for file databases)
+            if self._is_memory_database(database_url):
+                # An in-memory database lives inside its one connection, so every
+                # session (on any thread) must share it
+                self.engine = create_engine(
+                    database_url,
+                    connect_args={
+                        "check_same_thread": False,
+                        "timeout": 30
+                    },
+                    poolclass=StaticPool,
+                    query_cache_size=QUERY_CACHE_SIZE,
+                    json_serializer=_json_serializer,
+                    json_deserializer=_json_deserializer,
+                    echo=False  # Set to True for SQL debugging
+                )
+                self.read_engine = self.engine
+            else:
+                self.engine = self._create_pooled_engine(database_url, WRITE_POOL_SIZE)
+                self.read_engine = self._create_pooled_engine(database_url, READ_POOL_SIZE)
             
-            # Configure SQLCipher if encrypted
-            if self.is_encrypted:
-                self._configure_sqlcipher(self.engine)
+            # Configure SQLCipher if encrypted, plain SQLite tuning otherwise
+            engines = [self.engine] if self.read_engine is self.engine else [self.engine, self.read_engine]
+            for db_engine in engines:
+                if self.is_encrypted:
+                    self._configure_sqlcipher(db_engine)
+                else:
+                    self._configure_sqlite(db_engine)
+            if self.read_engine is not self.engine:
+                event.listen(self.read_engine, "connect", _set_query_only)
             
-            # Create session factory
+            # Create session factories
+            # (SQLModel sessions: callers use session.exec)
             self.session_factory = sessionmaker(
+                class_=SQLModelSession,
                 autocommit=False,
                 autoflush=False,
                 bind=self.engine
             )
+            self.read_session_factory = sessionmaker(
+                class_=SQLModelSession,
+                autocommit=False,
+                autoflush=False,
+                bind=self.read_engine
+            )
             
             # Set global variables for compatibility
             engine = self.engine
@@ -135,6 +397,17 @@ class DatabaseManager:
             
             # Create tables
             SQLModel.metadata.create_all(bind=self.engine)
+            with self.engine.begin() as connection:
+                converted = convert_legacy_uuid_columns(connection)
+                converted_contents = convert_legacy_message_content(connection)
+                # create_all skips indexes of tables that already exist
+                created_indexes = ensure_indexes(connection)
+            if converted:
+                db_logger.info("Converted %d legacy hex ids to binary UUIDs", converted)
+            if converted_contents:
+                db_logger.info("Converted %d legacy TEXT message contents to BLOBs", converted_contents)
+            if created_indexes:
+                db_logger.info("Created %d missing indexes", created_indexes)
             
             audit_logger.log_security_event(
                 event_type="DATABASE_INITIALIZED",
@@ -148,7 +421,7 @@ class DatabaseManager:
             db_logger.info("Database initialized successfully")
             
         except Exception as e:
-            db_logger.error(f"Database initialization failed: {str(e)}")
+            db_logger.error("Database initialization failed: %s", e)
             audit_logger.log_security_event(
                 event_type="DATABASE_INIT_FAILED",
                 severity="ERROR",
@@ -156,6 +429,28 @@ class DatabaseManager:
             )
             raise
     
+    @staticmethod
+    def _is_memory_database(database_url: str) -> bool:
+        """Check if the URL points at an in-memory SQLite database"""
+        return database_url.endswith(":memory:") or database_url.rstrip("/").endswith("sqlite:")
+    
+    @staticmethod
+    def _create_pooled_engine(database_url: str, pool_size: int):
+        """Create a file-database engine backed by a bounded connection pool"""
+        return create_engine(
+            database_url,
+            connect_args={"timeout": 30},
+            poolclass=QueuePool,
+            pool_size=pool_size,
+            max_overflow=POOL_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=POOL_RECYCLE_SECONDS,
+            query_cache_size=QUERY_CACHE_SIZE,
+            json_serializer=_json_serializer,
+            json_deserializer=_json_deserializer,
+            echo=False  # Set to True for SQL debugging
+        )
+    
     def _is_sqlcipher_available(self) -> bool:
         """Check if SQLCipher is available"""
         try:
@@ -172,7 +467,28 @@ class DatabaseManager:
         else:
             db_path = "./budget_assistant_encrypted.db"
         
-        return f"sqlite+pysqlcipher://:{encryption_key}@/{db_path}"
+        raw_key = self._derive_raw_key(encryption_key, db_path)
+        return f"sqlite+pysqlcipher://:{quote_plus(raw_key)}@/{db_path}"
+    
+    @staticmethod
+    def _derive_raw_key(encryption_key: str, db_path: str) -> str:
+        """
+        Run SQLCipher's passphrase KDF once and return a raw key literal.
+        
+        SQLCipher would otherwise repeat PBKDF2 (SQLCIPHER_KDF_ITER rounds) on every
+        new pooled connection. The raw key carries the file's salt (read from its
+        header, or fresh for a new database), so it opens exactly the databases the
+        passphrase does and new files stay openable by passphrase.
+        """
+        salt = b""
+        if os.path.isfile(db_path):
+            with open(db_path, "rb") as db_file:
+                salt = db_file.read(SQLCIPHER_SALT_SIZE)
+        if len(salt) < SQLCIPHER_SALT_SIZE:
+            salt = os.urandom(SQLCIPHER_SALT_SIZE)
+        
+        key = hashlib.pbkdf2_hmac("sha256", encryption_key.encode(), salt, SQLCIPHER_KDF_ITER, 32)
+        return f"x'{key.hex()}{salt.hex()}'"
     
     def _configure_sqlcipher(self, engine) -> None:
         """Configure SQLCipher encryption settings"""
@@ -181,11 +497,14 @@ class DatabaseManager:
             """Set SQLCipher encryption pragmas"""
             cursor = dbapi_connection.cursor()
             
-            # Set encryption settings
+            # Set encryption settings (the dialect has already issued PRAGMA key;
+            # SQLCipher requires these after the key and before first access)
             cursor.execute("PRAGMA cipher_page_size = 4096")
-            cursor.execute("PRAGMA kdf_iter = 64000")  # PBKDF2 iterations
+            cursor.execute(f"PRAGMA kdf_iter = {SQLCIPHER_KDF_ITER}")  # PBKDF2 iterations (passphrase keys only)
             cursor.execute("PRAGMA cipher_hmac_algorithm = HMAC_SHA256")
             cursor.execute("PRAGMA cipher_kdf_algorithm = PBKDF2_HMAC_SHA256")
+            if not SQLCIPHER_MEMORY_SECURITY:
+                cursor.execute("PRAGMA cipher_memory_security = OFF")
             
             # Enable foreign keys
             cursor.execute("PRAGMA foreign_keys=ON")
@@ -193,20 +512,40 @@ class DatabaseManager:
             # Set secure delete
             cursor.execute("PRAGMA secure_delete = ON")
             
+            _apply_performance_pragmas(cursor)
+            # Larger page cache for encrypted pages (each miss costs a decrypt)
+            cursor.execute("PRAGMA cache_size = -131072")  # 128MB
+            cursor.close()
+    
+    def _configure_sqlite(self, engine) -> None:
+        """Configure unencrypted SQLite connection settings"""
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragma(dbapi_connection, connection_record):
+            """Set SQLite pragmas"""
+            cursor = dbapi_connection.cursor()
+            _apply_performance_pragmas(cursor)
             cursor.close()
     
     def get_session(self) -> Session:
-        """Get database session"""
+        """Get database session (read/write)"""
         if not self.session_factory:
             raise RuntimeError("Database not initialized")
         return self.session_factory()
     
+    get_write_session = get_session
+    
+    def get_read_session(self) -> Session:
+        """Get read-only database session from the reader pool"""
+        if not self.read_session_factory:
+            raise RuntimeError("Database not initialized")
+        return self.read_session_factory()
+    
     def close_session(self, session: Session) -> None:
         """Close database session"""
         try:
             session.close()
         except Exception as e:
-            db_logger.error(f"Error closing session: {str(e)}")
+            db_logger.error("Error closing session: %s", e)
     
     def backup_database(self, backup_path: str, encryption_key: Optional[str] = None) -> bool:
         """Create encrypted backup of database"""
@@ -233,11 +572,11 @@ class DatabaseManager:
                 details={"backup_path": backup_path, "encrypted": bool(encryption_key)}
             )
             
-            db_logger.info(f"Database backup created: {backup_path}")
+            db_logger.info("Database backup created: %s", backup_path)
             return True
             
         except Exception as e:
-            db_logger.error(f"Database backup failed: {str(e)}")
+            db_logger.error("Database backup failed: %s", e)
             audit_logger.log_security_event(
                 event_type="DATABASE_BACKUP_FAILED",
                 severity="ERROR",
@@ -253,14 +592,14 @@ class DatabaseManager:
             
             with self.engine.connect() as conn:
                 # Check database integrity
-                result = conn.execute("PRAGMA integrity_check")
+                result = conn.execute(_INTEGRITY_CHECK_STMT)
                 integrity_result = result.fetchone()[0]
                 
                 if integrity_result == "ok":
                     db_logger.info("Database integrity check passed")
                     return True
                 else:
-                    db_logger.error(f"Database integrity check failed: {integrity_result}")
+                    db_logger.error("Database integrity check failed: %s", integrity_result)
                     audit_logger.log_security_event(
                         event_type="DATABASE_INTEGRITY_FAILED",
                         severity="ERROR",
@@ -269,7 +608,7 @@ class DatabaseManager:
                     return False
                     
         except Exception as e:
-            db_logger.error(f"Database integrity check error: {str(e)}")
+            db_logger.error("Database integrity check error: %s", e)
             return False
 
 # Global database manager
@@ -280,8 +619,16 @@ def get_database_manager() -> DatabaseManager:
     return db_manager
 
 def get_db() -> Session:
-    """FastAPI dependency for database session"""
-    session = db_manager.get_session()
+    """FastAPI dependency for read-only database session"""
+    session = db_manager.get_read_session()
+    try:
+        yield session
+    finally:
+        db_manager.close_session(session)
+
+def get_write_db() -> Session:
+    """FastAPI dependency for read/write database session"""
+    session = db_manager.get_write_session()
     try:
         yield session
     finally:
@@ -293,14 +640,24 @@ async def init_db() -> None:
         encryption_key = ENCRYPTION_KEY if ENCRYPTION_KEY != "change_this_in_production" else None
         db_manager.initialize_database(encryption_key)
         
-        # Verify database integrity
-        if not db_manager.verify_database_integrity():
+        # Verify database integrity (opt-in, see DB_CHECK_INTEGRITY)
+        if DB_CHECK_INTEGRITY and not db_manager.verify_database_integrity():
             raise RuntimeError("Database integrity check failed")
             
     except Exception as e:
-        db_logger.error(f"Database initialization failed: {str(e)}")
+        db_logger.error("Database initialization failed: %s", e)
         raise
 
+def bulk_insert_messages(session: Session, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert message rows with one executemany INSERT (the caller commits)"""
+    for message in messages:
+        # Core inserts skip the model's Python-side defaults
+        message.setdefault("id", uuid4())
+        message.setdefault("timestamp", datetime.utcnow())
+    if messages:
+        session.execute(insert(Message), messages)
+    return messages
+
 class DatabaseAuditMixin:
     """Mixin for database models to add audit logging"""
     
@@ -335,9 +692,10 @@ def check_database_health() -> Dict[str, Any]:
         if not db_manager.engine:
             return {"status": "error", "message": "Database not initialized"}
         
-        with db_manager.engine.connect() as conn:
+        # Pooled reader connection: no file open (or SQLCipher key derivation) per probe
+        with db_manager.read_engine.connect() as conn:
             # Test connection
-            conn.execute("SELECT 1")
+            conn.execute(_HEALTH_CHECK_STMT)
             
             # Check if encrypted
             encryption_status = "encrypted" if db_manager.is_encrypted else "unencrypted"
@@ -5,24 +5,47 @@ Following PCI-DSS, GDPR, and CCPA compliance requirements
 """
 
 import os
+import time
+import threading
+import hmac
 import hashlib
 import secrets
+from functools import lru_cache
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
-from cryptography.fernet import Fernet
+from typing import Optional, Dict, Any, List, Tuple
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 import base64
+import queue
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # Configure security logging
 security_logger = logging.getLogger("security")
 security_logger.setLevel(logging.INFO)
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+try:
+    import argon2  # noqa: F401  (passlib's argon2 backend)
+    _PIN_SCHEMES = ["argon2", "bcrypt"]
+except ImportError:  # optional, fall back to bcrypt only
+    _PIN_SCHEMES = ["bcrypt"]
+
+# Password hashing context (bcrypt hashes are upgraded to argon2id on login when available)
+pwd_context = CryptContext(schemes=_PIN_SCHEMES, deprecated="auto")
+
+# Successful PIN checks are remembered briefly so repeat logins skip the slow hash.
+# Entries hold an HMAC of the PIN under a per-process key, never the PIN itself.
+PIN_VERIFY_CACHE_TTL_SECONDS = 30
+PIN_VERIFY_CACHE_SIZE = 1024
+_PIN_CACHE_KEY = secrets.token_bytes(32)
 
 # Security configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", secrets.token_urlsafe(32))
@@ -31,6 +54,19 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 ENCRYPTION_KEY_SALT = os.getenv("SECURITY_SALT", "default_salt_change_in_production").encode()
 
+_DECODE_ALGORITHMS = [ALGORITHM]
+
+# Verified tokens kept in memory; a hit skips the signature check (exp is still
+# re-checked on every use, and invalid tokens are never cached)
+TOKEN_DECODE_CACHE_SIZE = int(os.getenv("TOKEN_DECODE_CACHE_SIZE", "4096"))
+
+@lru_cache(maxsize=TOKEN_DECODE_CACHE_SIZE)
+def _decode_token(token: str) -> Tuple[Dict[str, Any], float]:
+    """Verify and decode a JWT once; returns (payload, exp timestamp)"""
+    payload = jwt.decode(token, SECRET_KEY, algorithms=_DECODE_ALGORITHMS)
+    expires_at = payload.get("exp")
+    return payload, float(expires_at) if expires_at is not None else float("inf")
+
 class DataClassification:
     """Data classification levels for financial data protection"""
     PUBLIC = "public"           # Level 1: General budget categories
@@ -38,71 +74,193 @@ class DataClassification:
     CONFIDENTIAL = "confidential"  # Level 3: Account balances, transactions
     RESTRICTED = "restricted"   # Level 4: Auth credentials, encryption keys
 
+# AES-GCM nonce size (96-bit, the size GCM is specified for)
+NONCE_SIZE = 12
+
+# PBKDF2 work factor (OWASP 2023); data encrypted under the previous count still decrypts
+KDF_ITERATIONS = 600_000
+LEGACY_KDF_ITERATIONS = 100_000
+# Derived keys are reused within a process for this long, then re-derived
+DERIVED_KEY_TTL_SECONDS = 3600
+
+# (PIN fingerprint, iterations) -> (derived key, monotonic expiry)
+_derived_keys: Dict[Tuple[str, int], Tuple[bytearray, float]] = {}
+_derived_keys_lock = threading.Lock()
+
+def _derive_key(user_pin: str, iterations: int) -> bytes:
+    """PBKDF2-HMAC-SHA256 of the PIN, memoized per process for DERIVED_KEY_TTL_SECONDS"""
+    fingerprint = hashlib.sha256(user_pin.encode() + ENCRYPTION_KEY_SALT).hexdigest()
+    now = time.monotonic()
+    with _derived_keys_lock:
+        for cache_key in [k for k, (_, expires_at) in _derived_keys.items() if expires_at <= now]:
+            _zero(_derived_keys.pop(cache_key)[0])
+        cached = _derived_keys.get((fingerprint, iterations))
+    if cached is not None:
+        return bytes(cached[0])
+    
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=ENCRYPTION_KEY_SALT,
+        iterations=iterations,
+    )
+    key = kdf.derive(user_pin.encode())
+    with _derived_keys_lock:
+        _derived_keys[(fingerprint, iterations)] = (bytearray(key), now + DERIVED_KEY_TTL_SECONDS)
+    return key
+
+def _zero(buffer: bytearray) -> None:
+    buffer[:] = bytes(len(buffer))
+
 class EncryptionManager:
     """Manages encryption/decryption for sensitive financial data"""
     
     def __init__(self):
         self._encryption_key = None
+        self._aead = None
+        # Previous-iteration key, only for decrypting data written before the bump
+        # (AES-GCM, or Fernet from before AES-GCM)
+        self._legacy_aead = None
         self._fernet = None
     
     def initialize_encryption(self, user_pin: str) -> None:
         """Initialize encryption with user-derived key"""
         try:
-            # Derive encryption key from user PIN using PBKDF2
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=ENCRYPTION_KEY_SALT,
-                iterations=100000,  # NIST recommended minimum
-            )
-            key = base64.urlsafe_b64encode(kdf.derive(user_pin.encode()))
+            # Derive encryption key from user PIN using PBKDF2 (cached per process)
+            key = _derive_key(user_pin, KDF_ITERATIONS)
+            legacy_key = _derive_key(user_pin, LEGACY_KDF_ITERATIONS)
             self._encryption_key = key
-            self._fernet = Fernet(key)
+            self._aead = AESGCM(key)
+            self._legacy_aead = AESGCM(legacy_key)
+            self._fernet = Fernet(base64.urlsafe_b64encode(legacy_key))
             
             security_logger.info("Encryption initialized successfully")
         except Exception as e:
-            security_logger.error(f"Encryption initialization failed: {str(e)}")
+            security_logger.error("Encryption initialization failed: %s", e)
             raise SecurityException("Failed to initialize encryption")
     
-    def encrypt_data(self, data: str, classification: str = DataClassification.CONFIDENTIAL) -> str:
-        """Encrypt sensitive data based on classification level"""
-        if not self._fernet:
+    def _encrypt(self, plaintext: bytes) -> bytes:
+        """AES-256-GCM encrypt; returns nonce || ciphertext+tag"""
+        nonce = secrets.token_bytes(NONCE_SIZE)
+        return nonce + self._aead.encrypt(nonce, plaintext, None)
+    
+    def _decrypt(self, blob: bytes) -> bytes:
+        """Decrypt nonce || ciphertext+tag, falling back to legacy keys and Fernet tokens"""
+        nonce, ciphertext = blob[:NONCE_SIZE], blob[NONCE_SIZE:]
+        try:
+            return self._aead.decrypt(nonce, ciphertext, None)
+        except InvalidTag:
+            pass
+        try:
+            return self._legacy_aead.decrypt(nonce, ciphertext, None)
+        except InvalidTag:
+            pass
+        try:
+            # Fernet-era values were stored as urlsafe base64 of the Fernet token
+            return self._fernet.decrypt(base64.urlsafe_b64decode(blob))
+        except (InvalidToken, ValueError):
+            raise InvalidTag()
+    
+    def zeroize(self) -> None:
+        """Forget the derived keys (this manager's and the process cache)"""
+        self._encryption_key = None
+        self._aead = None
+        self._legacy_aead = None
+        self._fernet = None
+        with _derived_keys_lock:
+            for derived_key, _ in _derived_keys.values():
+                _zero(derived_key)
+            _derived_keys.clear()
+    
+    def encrypt_data(self, data: str, classification: str = DataClassification.CONFIDENTIAL) -> bytes:
+        """Encrypt sensitive data based on classification level (raw bytes, for BLOB columns)"""
+        if not self._aead:
             raise SecurityException("Encryption not initialized")
         
         try:
             if classification in [DataClassification.CONFIDENTIAL, DataClassification.RESTRICTED]:
-                encrypted_data = self._fernet.encrypt(data.encode())
-                security_logger.info(f"Data encrypted with classification: {classification}")
-                return base64.urlsafe_b64encode(encrypted_data).decode()
+                encrypted_data = self._encrypt(data.encode())
+                security_logger.info("Data encrypted with classification: %s", classification)
+                return encrypted_data
             else:
                 # Lower classification levels don't require encryption
-                return data
+                return data.encode()
+        except Exception as e:
+            security_logger.error("Encryption failed: %s", e)
+            raise SecurityException("Data encryption failed")
+    
+    def encrypt_many(self, items: List[str], classification: str = DataClassification.CONFIDENTIAL) -> List[bytes]:
+        """Encrypt a batch of values (one cipher instance, one log line)"""
+        if not self._aead:
+            raise SecurityException("Encryption not initialized")
+        
+        if classification not in [DataClassification.CONFIDENTIAL, DataClassification.RESTRICTED]:
+            return [item.encode() for item in items]
+        try:
+            encrypt = self._encrypt
+            encrypted = [encrypt(item.encode()) for item in items]
+            security_logger.info("%d items encrypted with classification: %s", len(encrypted), classification)
+            return encrypted
         except Exception as e:
-            security_logger.error(f"Encryption failed: {str(e)}")
+            security_logger.error("Encryption failed: %s", e)
             raise SecurityException("Data encryption failed")
     
-    def decrypt_data(self, encrypted_data: str, classification: str = DataClassification.CONFIDENTIAL) -> str:
+    def decrypt_many(self, items: List[bytes],
+                     classification: str = DataClassification.CONFIDENTIAL) -> List[Optional[str]]:
+        """Decrypt a batch of values; None marks items that could not be decrypted"""
+        if not self._aead:
+            raise SecurityException("Encryption not initialized")
+        
+        if classification not in [DataClassification.CONFIDENTIAL, DataClassification.RESTRICTED]:
+            return [item.decode() for item in items]
+        decrypt = self._decrypt
+        decrypted: List[Optional[str]] = []
+        failed = 0
+        for item in items:
+            try:
+                decrypted.append(decrypt(item).decode())
+            except Exception:
+                decrypted.append(None)
+                failed += 1
+        if failed:
+            security_logger.error("Decryption failed for %d of %d items", failed, len(items))
+        return decrypted
+    
+    def decrypt_data(self, encrypted_data: bytes, classification: str = DataClassification.CONFIDENTIAL) -> str:
         """Decrypt sensitive data"""
-        if not self._fernet:
+        if not self._aead:
             raise SecurityException("Encryption not initialized")
         
         try:
             if classification in [DataClassification.CONFIDENTIAL, DataClassification.RESTRICTED]:
-                decoded_data = base64.urlsafe_b64decode(encrypted_data.encode())
-                decrypted_data = self._fernet.decrypt(decoded_data)
-                return decrypted_data.decode()
+                return self._decrypt(encrypted_data).decode()
             else:
-                return encrypted_data
+                return encrypted_data.decode()
         except Exception as e:
-            security_logger.error(f"Decryption failed: {str(e)}")
+            security_logger.error("Decryption failed: %s", e)
             raise SecurityException("Data decryption failed")
 
+# Failed-login bookkeeping: a user's state is forgotten once it has been idle
+# this long (never shorter than the longest lockout)
+LOCKOUT_STATE_TTL_SECONDS = 1800
+MAX_LOCKOUT_STATES = 100_000
+
+@dataclass(slots=True)
+class LockoutState:
+    """Failed attempts for one user (monotonic timestamps)"""
+    attempts: int = 0
+    locked_until: float = 0.0
+    updated_at: float = 0.0
+
 class AuthenticationManager:
     """Manages user authentication with PIN/biometric support"""
     
     def __init__(self):
-        self.failed_attempts: Dict[str, int] = {}
-        self.lockout_times: Dict[str, datetime] = {}
+        # user_id -> LockoutState, least recently updated first
+        self.lockouts: "OrderedDict[str, LockoutState]" = OrderedDict()
+        self._lockouts_lock = threading.Lock()
+        # hashed PIN -> (HMAC of the verified PIN, monotonic expiry)
+        self._verified_pins: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
     
     def hash_pin(self, pin: str) -> str:
         """Hash user PIN securely"""
@@ -110,7 +268,21 @@ class AuthenticationManager:
     
     def verify_pin(self, pin: str, hashed_pin: str) -> bool:
         """Verify user PIN against hash"""
-        return pwd_context.verify(pin, hashed_pin)
+        return self.verify_and_update_pin(pin, hashed_pin)[0]
+    
+    def verify_and_update_pin(self, pin: str, hashed_pin: str) -> Tuple[bool, Optional[str]]:
+        """Verify PIN; returns (valid, new hash) where new hash is set if the scheme was upgraded"""
+        digest = hmac.new(_PIN_CACHE_KEY, pin.encode(), hashlib.sha256).digest()
+        cached = self._verified_pins.get(hashed_pin)
+        if cached is not None and cached[1] > time.monotonic() and hmac.compare_digest(cached[0], digest):
+            return True, None
+        
+        valid, new_hash = pwd_context.verify_and_update(pin, hashed_pin)
+        if valid:
+            self._verified_pins[new_hash or hashed_pin] = (digest, time.monotonic() + PIN_VERIFY_CACHE_TTL_SECONDS)
+            while len(self._verified_pins) > PIN_VERIFY_CACHE_SIZE:
+                self._verified_pins.popitem(last=False)
+        return valid, new_hash
     
     def create_access_token(self, data: Dict[str, Any]) -> str:
         """Create JWT access token"""
@@ -119,7 +291,7 @@ class AuthenticationManager:
         to_encode.update({"exp": expire, "type": "access"})
         
         token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-        security_logger.info(f"Access token created for user: {data.get('sub', 'unknown')}")
+        security_logger.info("Access token created for user: %s", data.get('sub', 'unknown'))
         return token
     
     def create_refresh_token(self, data: Dict[str, Any]) -> str:
@@ -129,51 +301,130 @@ class AuthenticationManager:
         to_encode.update({"exp": expire, "type": "refresh"})
         
         token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-        security_logger.info(f"Refresh token created for user: {data.get('sub', 'unknown')}")
+        security_logger.info("Refresh token created for user: %s", data.get('sub', 'unknown'))
         return token
     
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify and decode JWT token"""
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            return payload
+            payload, expires_at = _decode_token(token)
         except JWTError as e:
-            security_logger.warning(f"Token verification failed: {str(e)}")
+            security_logger.warning("Token verification failed: %s", e)
+            return None
+        # Cached decodes skip jose's exp check, so re-check it here
+        if expires_at < time.time():
+            security_logger.warning("Token verification failed: Signature has expired.")
             return None
+        return dict(payload)
     
     def check_account_lockout(self, user_id: str) -> bool:
         """Check if account is locked due to failed attempts"""
-        if user_id in self.lockout_times:
-            lockout_time = self.lockout_times[user_id]
-            if datetime.utcnow() < lockout_time:
+        state = self.lockouts.get(user_id)
+        if state is not None and state.locked_until:
+            if time.monotonic() < state.locked_until:
                 return True
             else:
                 # Lockout period expired
-                del self.lockout_times[user_id]
-                self.failed_attempts[user_id] = 0
+                state.locked_until = 0.0
+                state.attempts = 0
         return False
     
     def record_failed_attempt(self, user_id: str) -> None:
         """Record failed authentication attempt"""
-        self.failed_attempts[user_id] = self.failed_attempts.get(user_id, 0) + 1
+        now = time.monotonic()
+        with self._lockouts_lock:
+            lockouts = self.lockouts
+            state = lockouts.pop(user_id, None)
+            if state is None:
+                state = LockoutState()
+            # Drop idle states (oldest first) and keep the map bounded
+            while lockouts:
+                oldest = next(iter(lockouts.values()))
+                if now - oldest.updated_at < LOCKOUT_STATE_TTL_SECONDS and len(lockouts) < MAX_LOCKOUT_STATES:
+                    break
+                lockouts.popitem(last=False)
+            state.attempts += 1
+            state.updated_at = now
+            lockouts[user_id] = state
         
         # Progressive lockout: 5 attempts = 5 min, 10 attempts = 30 min
-        if self.failed_attempts[user_id] >= 10:
-            self.lockout_times[user_id] = datetime.utcnow() + timedelta(minutes=30)
-            security_logger.warning(f"Account locked for 30 minutes: {user_id}")
-        elif self.failed_attempts[user_id] >= 5:
-            self.lockout_times[user_id] = datetime.utcnow() + timedelta(minutes=5)
-            security_logger.warning(f"Account locked for 5 minutes: {user_id}")
+        if state.attempts >= 10:
+            state.locked_until = now + 30 * 60
+            security_logger.warning("Account locked for 30 minutes: %s", user_id)
+        elif state.attempts >= 5:
+            state.locked_until = now + 5 * 60
+            security_logger.warning("Account locked for 5 minutes: %s", user_id)
     
     def reset_failed_attempts(self, user_id: str) -> None:
         """Reset failed attempts after successful authentication"""
-        if user_id in self.failed_attempts:
-            del self.failed_attempts[user_id]
-        if user_id in self.lockout_times:
-            del self.lockout_times[user_id]
+        with self._lockouts_lock:
+            self.lockouts.pop(user_id, None)
+
+# Audit log rotation
+AUDIT_LOG_MAX_BYTES = 10 * 1024 * 1024
+AUDIT_LOG_BACKUP_COUNT = 5
+# Most records buffered between audit file flushes
+AUDIT_LOG_FLUSH_BATCH = 100
+
+class _DeferredFormatQueueHandler(QueueHandler):
+    """Enqueue records unformatted; the listener thread formats them when writing"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+class _BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotating file handler for the audit writer thread.
+
+    Tracks the file size itself (the stock rollover check seeks, and so
+    flushes, on every record) and formats each record once. Writes are
+    flushed every AUDIT_LOG_FLUSH_BATCH records or when flush() is called.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Never roll over anything other than a regular file (bpo-45401)
+        self._rotates = self.maxBytes > 0 and (
+            not os.path.exists(self.baseFilename) or os.path.isfile(self.baseFilename)
+        )
+        self._size = self.stream.seek(0, 2)
+        self._pending = 0
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = self.format(record) + self.terminator
+            if self._rotates and self._size and self._size + len(msg) >= self.maxBytes:
+                self.doRollover()
+                self._size = 0
+            self.stream.write(msg)
+            self._size += len(msg)
+            self._pending += 1
+            if self._pending >= AUDIT_LOG_FLUSH_BATCH:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self) -> None:
+        self._pending = 0
+        super().flush()
+
+class _BatchingQueueListener(QueueListener):
+    """Queue listener that flushes its handlers whenever the queue runs dry"""
+    
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+        return self.queue.get(block)
 
 class SecurityAuditLogger:
-    """Comprehensive security audit logging"""
+    """Comprehensive security audit logging
+
+    Event timestamps are epoch seconds (time.time()); the line prefix carries
+    the formatted time, rendered on the writer thread.
+    """
     
     def __init__(self):
         self.audit_logger = logging.getLogger("security_audit")
@@ -189,52 +440,88 @@ class SecurityAuditLogger:
             audit_log_path = os.path.join(os.getcwd(), "logs", "security_audit.log")
             os.makedirs(os.path.dirname(audit_log_path), exist_ok=True)
 
-        audit_handler = logging.FileHandler(audit_log_path)
+        audit_handler = _BatchedRotatingFileHandler(
+            audit_log_path,
+            maxBytes=AUDIT_LOG_MAX_BYTES,
+            backupCount=AUDIT_LOG_BACKUP_COUNT
+        )
         audit_formatter = logging.Formatter(
             '%(asctime)s - %(levelname)s - %(message)s'
         )
         audit_handler.setFormatter(audit_formatter)
-        self.audit_logger.addHandler(audit_handler)
+        
+        # Callers only enqueue; a background thread formats and writes, flushing
+        # the file once per burst (or every AUDIT_LOG_FLUSH_BATCH records)
+        audit_queue = queue.SimpleQueue()
+        self.audit_logger.addHandler(_DeferredFormatQueueHandler(audit_queue))
+        self._audit_handler = audit_handler
+        self._listener = _BatchingQueueListener(audit_queue, audit_handler, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self.shutdown)
+    
+    @property
+    def info_enabled(self) -> bool:
+        """Whether INFO events are recorded (check before building event details)"""
+        return self.audit_logger.isEnabledFor(logging.INFO)
+    
+    @property
+    def warning_enabled(self) -> bool:
+        """Whether WARNING events are recorded"""
+        return self.audit_logger.isEnabledFor(logging.WARNING)
+    
+    def shutdown(self) -> None:
+        """Flush queued audit records and stop the writer thread"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            self._audit_handler.flush()
     
     def log_authentication_event(self, user_id: str, event_type: str, 
                                 success: bool, details: Dict[str, Any] = None) -> None:
         """Log authentication events"""
+        level = logging.INFO if success else logging.WARNING
+        if not self.audit_logger.isEnabledFor(level):
+            return
         event_data = {
             "user_id": user_id,
             "event_type": event_type,
             "success": success,
-            "timestamp": datetime.utcnow().isoformat(),
-            "details": details or {}
+            "timestamp": time.time(),
+            "details": dict(details) if details else {}
         }
         
-        level = logging.INFO if success else logging.WARNING
-        self.audit_logger.log(level, f"AUTH_EVENT: {event_data}")
+        self.audit_logger.log(level, "AUTH_EVENT: %s", event_data)
     
     def log_data_access(self, user_id: str, data_type: str, 
                        classification: str, operation: str) -> None:
         """Log data access events"""
+        if not self.audit_logger.isEnabledFor(logging.INFO):
+            return
         event_data = {
             "user_id": user_id,
             "data_type": data_type,
             "classification": classification,
             "operation": operation,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": time.time()
         }
         
-        self.audit_logger.info(f"DATA_ACCESS: {event_data}")
+        self.audit_logger.info("DATA_ACCESS: %s", event_data)
     
     def log_security_event(self, event_type: str, severity: str, 
                           details: Dict[str, Any]) -> None:
         """Log general security events"""
+        level = getattr(logging, severity.upper(), logging.INFO)
+        if not self.audit_logger.isEnabledFor(level):
+            return
         event_data = {
             "event_type": event_type,
             "severity": severity,
-            "timestamp": datetime.utcnow().isoformat(),
-            "details": details
+            "timestamp": time.time(),
+            # Copied: the record is formatted later, on the writer thread
+            "details": dict(details) if details else details
         }
         
-        level = getattr(logging, severity.upper(), logging.INFO)
-        self.audit_logger.log(level, f"SECURITY_EVENT: {event_data}")
+        self.audit_logger.log(level, "SECURITY_EVENT: %s", event_data)
 
 class SecurityException(Exception):
     """Custom exception for security-related errors"""
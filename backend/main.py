@@ -1,10 +1,18 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
 import os
+import sys
 from dotenv import load_dotenv
 
+try:
+    import orjson  # noqa: F401  (backs ORJSONResponse)
+    DefaultResponse = ORJSONResponse
+except ImportError:  # optional speedup, fall back to stdlib json
+    DefaultResponse = JSONResponse
+
 # Load environment variables
 load_dotenv()
 
@@ -12,13 +20,7 @@ load_dotenv()
 from routers import health, transactions, budgets, bills, ai_chat, auth
 from core.database import init_db
 from core.security import get_audit_logger
-from middleware.security import (
-    SecurityHeadersMiddleware,
-    RequestValidationMiddleware,
-    APIVersionMiddleware,
-    ComplianceLoggingMiddleware,
-    ErrorHandlingMiddleware
-)
+from middleware.unified import UnifiedSecurityMiddleware
 
 # Create FastAPI app
 app = FastAPI(
@@ -26,15 +28,16 @@ app = FastAPI(
     description="A comprehensive AI-powered household budgeting application with CrewAI multi-agent system",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=DefaultResponse
 )
 
-# Add security middleware (order matters - first added is outermost)
-app.add_middleware(ErrorHandlingMiddleware)
-app.add_middleware(ComplianceLoggingMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(RequestValidationMiddleware)
-app.add_middleware(APIVersionMiddleware)
+# Compress JSON bodies of 1KB and up (e.g. conversation history); innermost, so
+# the security middleware sees the final headers
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Add security middleware (one pure-ASGI pass; check order is documented in middleware/unified.py)
+app.add_middleware(UnifiedSecurityMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -55,6 +58,11 @@ async def startup_event():
     from ai.crew_setup import initialize_crew
     await initialize_crew()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush the security audit log on shutdown."""
+    get_audit_logger().shutdown()
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["authentication"])
 app.include_router(health.router, prefix="/api/v1", tags=["health"])
@@ -111,5 +119,8 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        # uvloop + httptools (see requirements.txt); uvloop has no Windows build
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
     )
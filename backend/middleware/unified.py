@@ -0,0 +1,266 @@
+"""
+Unified Security Middleware
+Runs every per-request security control in one pure-ASGI pass
+
+Replaces the separate SecurityHeaders, RequestValidation, APIVersion,
+ComplianceLogging and ErrorHandling middlewares. Every request, in order:
+  1. Request ID assigned (request.state.request_id) and API_REQUEST audited
+  2. Request validation: size, user agent, URL patterns, JSON content type
+  3. API version check for /api/ paths
+  4. Financial data / auth endpoint access audited
+  5. The app runs; an unhandled error becomes a generic 500 if nothing was sent yet
+On response start: security headers, X-Request-ID and X-API-Version are added,
+and API_RESPONSE (plus REQUEST_FAILED for 4xx/5xx) is audited.
+AUDIT_SKIP_PATHS (health probes, docs, static files) go through every check
+but write none of the per-request records (API_REQUEST/API_RESPONSE/REQUEST_FAILED).
+"""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional, Tuple
+from os import urandom
+import time
+
+from .security import (
+    audit_logger,
+    security_logger,
+    SECURITY_HEADERS,
+    BLOCKED_USER_AGENT_RE,
+    SUSPICIOUS_PATTERN_RE,
+    MAX_REQUEST_SIZE,
+    SUPPORTED_API_VERSIONS,
+    CURRENT_API_VERSION,
+    client_host,
+    exceeds_max_request_size,
+    is_audit_skipped,
+    is_financial_endpoint,
+    json_body,
+    send_json,
+)
+
+# (status code, JSON body) of a rejected request
+Rejection = Tuple[int, bytes]
+
+_API_VERSION_HEADER = (b"x-api-version", CURRENT_API_VERSION.encode())
+
+class UnifiedSecurityMiddleware:
+    """All security middleware in one pure-ASGI class (see module docstring for order)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+        # Rejections are static, so each body is serialized once
+        self._rejections = {
+            status_code: (status_code, json_body({"detail": detail}))
+            for status_code, detail in (
+                (400, "Bad request"),
+                (403, "Forbidden"),
+                (413, "Request entity too large"),
+                (415, "Unsupported media type"),
+            )
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        method = scope["method"]
+        client_ip = client_host(scope)
+        is_api = path.startswith("/api/")
+        content_length = user_agent = content_type = None
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                content_length = value
+            elif name == b"user-agent":
+                user_agent = value.decode("latin-1")
+            elif name == b"content-type":
+                content_type = value.decode("latin-1")
+
+        # 1. Request ID for tracking
+        # 128 random bits as hex, without building a UUID object
+        request_id = urandom(16).hex()
+        scope.setdefault("state", {})["request_id"] = request_id
+        start_time = time.time()
+
+        # Per-request INFO events are skipped outright (no details dicts) when INFO is off
+        audited = not is_audit_skipped(path)
+        audit_info = audited and audit_logger.info_enabled
+        if audit_info:
+            audit_logger.log_security_event(
+                event_type="API_REQUEST",
+                severity="INFO",
+                details={
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "client_ip": client_ip,
+                    "user_agent": user_agent or "unknown"
+                }
+            )
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                headers = list(message.get("headers", ()))
+                headers.extend(SECURITY_HEADERS)
+                headers.append((b"x-request-id", request_id.encode()))
+                if is_api:
+                    headers.append(_API_VERSION_HEADER)
+                message["headers"] = headers
+
+                if audit_info:
+                    response_size = 0
+                    for name, value in headers:
+                        if name == b"content-length":
+                            response_size = int(value)
+                            break
+                    audit_logger.log_security_event(
+                        event_type="API_RESPONSE",
+                        severity="INFO",
+                        details={
+                            "request_id": request_id,
+                            "status_code": status_code,
+                            "processing_time": round(time.time() - start_time, 3),
+                            "response_size": response_size
+                        }
+                    )
+
+                # Log failed requests for security monitoring
+                if audited and status_code >= 400:
+                    audit_logger.log_security_event(
+                        event_type="REQUEST_FAILED",
+                        severity="WARNING" if status_code < 500 else "ERROR",
+                        details={
+                            "status_code": status_code,
+                            "endpoint": path,
+                            "method": method,
+                            "client_ip": client_ip
+                        }
+                    )
+            await send(message)
+
+        # 2. Request validation, 3. API version
+        rejection = self._validate(path, method, client_ip, content_length, user_agent, content_type)
+        if rejection is None and is_api:
+            rejection = self._check_api_version(path)
+        if rejection is not None:
+            await send_json(send_wrapper, *rejection)
+            return
+
+        # 4. Compliance logging
+        if audit_info and is_financial_endpoint(path):
+            audit_logger.log_security_event(
+                event_type="FINANCIAL_DATA_ACCESS",
+                severity="INFO",
+                details={
+                    "endpoint": path,
+                    "method": method,
+                    "client_ip": client_ip,
+                    "timestamp": time.time()
+                }
+            )
+        if audit_info and path.startswith("/api/v1/auth/"):
+            audit_logger.log_security_event(
+                event_type="AUTH_ENDPOINT_ACCESS",
+                severity="INFO",
+                details={
+                    "endpoint": path,
+                    "method": method,
+                    "client_ip": client_ip
+                }
+            )
+
+        # 5. Error handling
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # Log error for debugging (internal only)
+            security_logger.error("Unhandled error: %s", e)
+
+            audit_logger.log_security_event(
+                event_type="UNHANDLED_ERROR",
+                severity="ERROR",
+                details={
+                    "error_type": type(e).__name__,
+                    "endpoint": path,
+                    "method": method,
+                    "client_ip": client_ip
+                }
+            )
+            if response_started:
+                # Too late for a clean error response
+                raise
+
+            # Return generic error response (don't expose internal details)
+            await send_json(send_wrapper, 500, json_body({
+                "detail": "Internal server error",
+                "request_id": request_id
+            }))
+
+    def _validate(self, path: str, method: str, client_ip: str, content_length: Optional[bytes],
+                  user_agent: Optional[str], content_type: Optional[str]) -> Optional[Rejection]:
+        """Return the rejection for a request, or None if it may proceed"""
+        # Check request size
+        if content_length and exceeds_max_request_size(content_length):
+            audit_logger.log_security_event(
+                event_type="REQUEST_TOO_LARGE",
+                severity="WARNING",
+                details={
+                    "content_length": content_length.decode("latin-1"),
+                    "max_allowed": MAX_REQUEST_SIZE,
+                    "client_ip": client_ip
+                }
+            )
+            return self._rejections[413]
+
+        # Check user agent
+        # (matchers ignore case, so nothing is lowercased unless it is logged)
+        if user_agent and BLOCKED_USER_AGENT_RE.search(user_agent):
+            audit_logger.log_security_event(
+                event_type="BLOCKED_USER_AGENT",
+                severity="WARNING",
+                details={
+                    "user_agent": user_agent.lower(),
+                    "client_ip": client_ip
+                }
+            )
+            return self._rejections[403]
+
+        # Check for suspicious patterns in URL
+        match = SUSPICIOUS_PATTERN_RE.search(path)
+        if match:
+            audit_logger.log_security_event(
+                event_type="SUSPICIOUS_REQUEST_PATTERN",
+                severity="WARNING",
+                details={
+                    "pattern": match.group().lower(),
+                    "path": path.lower(),
+                    "client_ip": client_ip
+                }
+            )
+            return self._rejections[400]
+
+        # Validate required headers for API endpoints
+        if path.startswith("/api/") and method in ("POST", "PUT", "PATCH"):
+            if not (content_type or "").startswith("application/json"):
+                return self._rejections[415]
+
+        return None
+
+    @staticmethod
+    def _check_api_version(path: str) -> Optional[Rejection]:
+        """Reject /api/<version>/... paths with an unsupported version"""
+        path_parts = path.split("/")
+        if len(path_parts) >= 3:
+            version = path_parts[2]  # /api/v1/...
+            if version not in SUPPORTED_API_VERSIONS:
+                return 400, json_body({
+                    "detail": f"Unsupported API version: {version}",
+                    "supported_versions": SUPPORTED_API_VERSIONS
+                })
+        return None
@@ -0,0 +1,42 @@
+"""binary uuid ids
+
+Revision ID: 5c2e7b9d41f3
+Revises: a016e84d70a4
+Create Date: 2026-10-15 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.database import convert_legacy_uuid_columns, _UUID_COLUMNS
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e7b9d41f3'
+down_revision: Union[str, Sequence[str], None] = 'a016e84d70a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Rewrite 32-char hex TEXT ids/foreign keys as 16-byte UUIDs."""
+    convert_legacy_uuid_columns(op.get_bind())
+
+
+def downgrade() -> None:
+    """Restore the hex TEXT ids."""
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    tables = set(sa.inspect(bind).get_table_names())
+    op.execute("PRAGMA defer_foreign_keys = ON")
+    for table, columns in _UUID_COLUMNS:
+        if table not in tables:
+            continue
+        for column in columns:
+            op.execute(
+                f"UPDATE {table} SET {column} = lower(hex({column})) "
+                f"WHERE typeof({column}) = 'blob'"
+            )
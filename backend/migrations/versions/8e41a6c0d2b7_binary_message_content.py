@@ -0,0 +1,30 @@
+"""binary message content
+
+Revision ID: 8e41a6c0d2b7
+Revises: 5c2e7b9d41f3
+Create Date: 2026-10-15 10:04:52.671390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.database import convert_legacy_message_content
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41a6c0d2b7'
+down_revision: Union[str, Sequence[str], None] = '5c2e7b9d41f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store base64 TEXT message contents as BLOBs."""
+    convert_legacy_message_content(op.get_bind())
+
+
+def downgrade() -> None:
+    """Nothing to undo: BLOB contents written since the upgrade have no TEXT form."""
+    pass
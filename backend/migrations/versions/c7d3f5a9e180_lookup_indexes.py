@@ -0,0 +1,32 @@
+"""lookup indexes
+
+Revision ID: c7d3f5a9e180
+Revises: 8e41a6c0d2b7
+Create Date: 2026-10-15 11:27:08.315442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.database import ensure_indexes
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3f5a9e180'
+down_revision: Union[str, Sequence[str], None] = '8e41a6c0d2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create ix_conv_user_updated, ix_conversations_retention_until and ix_msg_conv_ts."""
+    ensure_indexes(op.get_bind())
+
+
+def downgrade() -> None:
+    """Drop the lookup indexes."""
+    op.drop_index('ix_msg_conv_ts', table_name='messages', if_exists=True)
+    op.drop_index('ix_conversations_retention_until', table_name='conversations', if_exists=True)
+    op.drop_index('ix_conv_user_updated', table_name='conversations', if_exists=True)
@@ -3,13 +3,21 @@ AI Chat API Endpoints
 Handles natural language interactions with the CrewAI Master Agent system
 """
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import json
-import asyncio
-from datetime import datetime
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, date, timezone
+
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to stdlib json
+    orjson = None
 
 from ..ai.unified_agent import get_unified_agent, UnifiedFinancialAgent
 from ..core.auth import get_current_user, User
@@ -17,6 +25,41 @@ from ..core.ai_security import get_ai_security_filter, get_privacy_manager
 from ..services.conversation_service import get_conversation_service, ConversationService
 
 router = APIRouter()
+logger = logging.getLogger("ai_chat")
+
+def _json_default(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (datetime, date)) else str(value)
+
+def _json_bytes(payload: Any) -> bytes:
+    """Serialize a response payload to JSON bytes (datetimes as ISO 8601)"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str)
+    return json.dumps(payload, default=_json_default).encode()
+
+def _json_response(content: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """JSON response from a payload or pre-serialized bytes (bypasses response_model)"""
+    body = content if isinstance(content, bytes) else _json_bytes(content)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _sse_event(payload: Dict[str, Any]) -> bytes:
+    """Format one server-sent event"""
+    return b"data: " + _json_bytes(payload) + b"\n\n"
+
+# Content events only differ in index and text, so the envelope is pre-encoded
+_SSE_CONTENT_PREFIX = b'data: {"type":"content","index":'
+
+def _sse_content_event(index: int, text: str) -> bytes:
+    """Format a content event ({"type": "content", "index": ..., "data": ...})"""
+    return _SSE_CONTENT_PREFIX + str(index).encode() + b',"data":' + _json_bytes(text) + b"}\n\n"
+
+# Serialized conversation bodies: (conversation_id, user_id) -> (updated_at, ETag, JSON bytes).
+# An entry is only served while the conversation's updated_at still matches.
+CONVERSATION_CACHE_SIZE = 1024
+_conversation_cache: "OrderedDict[Tuple[str, str], Tuple[datetime, str, bytes]]" = OrderedDict()
+
+def _conversation_etag(conversation_id: str, updated_at: datetime) -> str:
+    digest = hashlib.blake2b(f"{conversation_id}:{updated_at.isoformat()}".encode(), digest_size=8)
+    return f'"{digest.hexdigest()}"'
 
 # Request/Response Models
 class ChatMessage(BaseModel):
@@ -42,9 +85,24 @@ class AgentStatus(BaseModel):
     system_status: str = Field(..., description="Overall system status")
     last_updated: datetime = Field(..., description="Last status update")
 
-@router.post("/chat", response_model=ChatResponse)
+async def _persist_turn(conversation_service: ConversationService, conversation_id: str,
+                        user_id: str, messages: List[Tuple[str, str]]) -> None:
+    """Store a chat turn's messages (background task)"""
+    try:
+        await conversation_service.create_messages(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            messages=messages
+        )
+        _conversation_cache.pop((conversation_id, str(user_id)), None)
+    except Exception:
+        # The response is already sent; record the failure instead of hiding it
+        logger.exception("Failed to persist chat turn for conversation %s", conversation_id)
+
+@router.post("/chat", responses={200: {"model": ChatResponse}})
 async def chat_with_ai(
     chat_request: ChatMessage,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     unified_agent: UnifiedFinancialAgent = Depends(get_unified_agent),
     conversation_service: ConversationService = Depends(get_conversation_service),
@@ -57,19 +115,7 @@ async def chat_with_ai(
     """
     try:
         # Generate conversation ID if not provided
-        conversation_id = chat_request.conversation_id or f"conv_{current_user.id}_{int(datetime.utcnow().timestamp())}"
-
-        # Persist user's message
-        try:
-            await conversation_service.create_message(
-                conversation_id=conversation_id,
-                user_id=current_user.id,
-                sender="user",
-                content=chat_request.message
-            )
-        except Exception:
-            # Log and continue if persistence fails
-            pass
+        conversation_id = chat_request.conversation_id or f"conv_{current_user.id}_{int(time.time())}"
 
         # Process query through Unified Agent
         agent_response = await unified_agent.process_query(
@@ -78,25 +124,24 @@ async def chat_with_ai(
             user_id=current_user.id
         )
 
-        # Persist AI response
-        try:
-            await conversation_service.create_message(
-                conversation_id=conversation_id,
-                user_id=current_user.id,
-                sender="ai",
-                content=agent_response.response_text
-            )
-        except Exception:
-            # Log and continue if persistence fails
-            pass
-
-        return ChatResponse(
-            response=agent_response.response_text,
-            conversation_id=conversation_id,
-            timestamp=datetime.utcnow(),
-            agent_used="unified_financial_agent",
-            confidence=agent_response.confidence
+        # Persist the whole turn (user message + AI response) in one transaction,
+        # after the response has been sent
+        background_tasks.add_task(
+            _persist_turn,
+            conversation_service,
+            conversation_id,
+            current_user.id,
+            [("user", chat_request.message), ("ai", agent_response.response_text)]
         )
+
+        # Serialized directly (shape of ChatResponse): no response-model validation pass
+        return _json_response({
+            "response": agent_response.response_text,
+            "conversation_id": conversation_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "agent_used": "unified_financial_agent",
+            "confidence": agent_response.confidence
+        })
         
     except Exception as e:
         raise HTTPException(
@@ -119,38 +164,25 @@ async def stream_chat_response(
     """
     async def generate_response():
         try:
-            # Process query through unified agent
-            agent_response = await unified_agent.process_query(
+            # Forward response text as the agent releases it
+            index = 0
+            async for text in unified_agent.stream_query(
                 user_input=message,
                 context={"conversation_id": conversation_id},
                 user_id=current_user.id
-            )
-
-            # Simulate streaming by yielding chunks
-            words = agent_response.response_text.split()
-            for i, word in enumerate(words):
-                chunk = {
-                    "type": "content",
-                    "data": word + " ",
-                    "index": i
-                }
-                yield f"data: {json.dumps(chunk)}\n\n"
-                await asyncio.sleep(0.1)  # Simulate processing delay
+            ):
+                yield _sse_content_event(index, text)
+                index += 1
             
             # Send completion signal
-            completion = {
+            yield _sse_event({
                 "type": "complete",
                 "data": "Response complete",
                 "conversation_id": conversation_id
-            }
-            yield f"data: {json.dumps(completion)}\n\n"
+            })
             
         except Exception as e:
-            error = {
-                "type": "error",
-                "data": str(e)
-            }
-            yield f"data: {json.dumps(error)}\n\n"
+            yield _sse_event({"type": "error", "data": str(e)})
     
     return StreamingResponse(
         generate_response(),
@@ -158,6 +190,8 @@ async def stream_chat_response(
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            # GZipMiddleware leaves encoded responses alone, so events are not buffered
+            "Content-Encoding": "identity",
         }
     )
 
@@ -176,9 +210,10 @@ async def get_conversations(
     # For MVP, return empty list - conversation persistence will be added later
     return []
 
-@router.get("/conversations/{conversation_id}", response_model=ConversationHistory)
+@router.get("/conversations/{conversation_id}", responses={200: {"model": ConversationHistory}})
 async def get_conversation(
     conversation_id: str,
+    request: Request,
     conversation_service: ConversationService = Depends(get_conversation_service),
     current_user = Depends(get_current_user)
 ):
@@ -186,22 +221,49 @@ async def get_conversation(
     Get a specific conversation with full message history.
     
     Useful for loading conversation context when resuming a chat session.
+    Unchanged conversations are answered from cache (or with 304 via If-None-Match).
     """
     try:
-        conversation = await conversation_service.get_conversation(
+        cache_key = (conversation_id, str(current_user.id))
+        updated_at = await conversation_service.get_conversation_updated_at(
             conversation_id=conversation_id,
             user_id=current_user.id
         )
-        
-        if not conversation:
+        if updated_at is None:
+            _conversation_cache.pop(cache_key, None)
             raise HTTPException(status_code=404, detail="Conversation not found")
         
-        return ConversationHistory(
-            conversation_id=conversation.id,
-            messages=conversation.messages,
-            created_at=conversation.created_at,
-            updated_at=conversation.updated_at
-        )
+        etag = _conversation_etag(conversation_id, updated_at)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        cached = _conversation_cache.get(cache_key)
+        if cached is not None and cached[0] == updated_at:
+            _conversation_cache.move_to_end(cache_key)
+            body = cached[2]
+        else:
+            conversation = await conversation_service.get_conversation(
+                conversation_id=conversation_id,
+                user_id=current_user.id
+            )
+            if not conversation:
+                raise HTTPException(status_code=404, detail="Conversation not found")
+            
+            # The version that was actually loaded keys the entry (and its ETag)
+            updated_at = conversation["updated_at"]
+            etag = _conversation_etag(conversation_id, updated_at)
+            body = _json_bytes({
+                "conversation_id": conversation["id"],
+                "messages": conversation["messages"],
+                "created_at": conversation["created_at"],
+                "updated_at": updated_at
+            })
+            _conversation_cache[cache_key] = (updated_at, etag, body)
+            _conversation_cache.move_to_end(cache_key)
+            while len(_conversation_cache) > CONVERSATION_CACHE_SIZE:
+                _conversation_cache.popitem(last=False)
+        
+        return _json_response(body, headers={"ETag": etag})
         
     except HTTPException:
         raise
@@ -228,6 +290,7 @@ async def delete_conversation(
             conversation_id=conversation_id,
             user_id=current_user.id
         )
+        _conversation_cache.pop((conversation_id, str(current_user.id)), None)
         
         if not success:
             raise HTTPException(status_code=404, detail="Conversation not found")
@@ -242,7 +305,7 @@ async def delete_conversation(
             detail=f"Error deleting conversation: {str(e)}"
         )
 
-@router.get("/agents/status", response_model=AgentStatus)
+@router.get("/agents/status", responses={200: {"model": AgentStatus}})
 async def get_agent_status(
     crew_manager: CrewAIManager = Depends(get_crew_manager)
 ):
@@ -254,13 +317,13 @@ async def get_agent_status(
     try:
         agent_status = crew_manager.get_agent_status()
         
-        return AgentStatus(
-            agents=agent_status,
-            system_status="operational" if all(
+        return _json_response({
+            "agents": agent_status,
+            "system_status": "operational" if all(
                 status == "active" for status in agent_status.values()
             ) else "degraded",
-            last_updated=datetime.utcnow()
-        )
+            "last_updated": datetime.now(timezone.utc).isoformat()
+        })
         
     except Exception as e:
         raise HTTPException(
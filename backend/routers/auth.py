@@ -3,11 +3,13 @@ Authentication API Endpoints
 Implements secure user authentication with PIN/biometric support
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from fastapi.security import HTTPBearer
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, Tuple
+from datetime import datetime, timezone
+import json
+import time
 
 from ..core.auth import (
     AuthService, 
@@ -54,7 +56,16 @@ class UserResponse(BaseModel):
     last_login: Optional[datetime]
     is_active: bool
 
-@router.post("/login", response_model=LoginResponse)
+def _client_ip(request: Request) -> str:
+    """Client IP for audit records"""
+    client = request.client
+    return client.host if client else "unknown"
+
+def _model_response(model: BaseModel) -> Response:
+    """Serialize an already-validated response model once (skips response_model re-validation)"""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+@router.post("/login", responses={200: {"model": LoginResponse}})
 async def login(
     request: Request,
     login_request: LoginRequest,
@@ -66,7 +77,7 @@ async def login(
     """
     try:
         # Get client IP for audit logging
-        client_ip = request.client.host
+        client_ip = _client_ip(request)
         
         # Authenticate user
         user = auth_service.authenticate_user(
@@ -104,13 +115,13 @@ async def login(
             "last_login": user.last_login.isoformat() if user.last_login else None
         }
         
-        return LoginResponse(
+        return _model_response(LoginResponse(
             access_token=session_data["access_token"],
             refresh_token=session_data["refresh_token"],
             token_type=session_data["token_type"],
             expires_in=session_data["expires_in"],
             user=user_data
-        )
+        ))
         
     except HTTPException:
         raise
@@ -118,14 +129,14 @@ async def login(
         audit_logger.log_security_event(
             event_type="LOGIN_ERROR",
             severity="ERROR",
-            details={"error": str(e), "client_ip": request.client.host}
+            details={"error": str(e), "client_ip": _client_ip(request)}
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Authentication service error"
         )
 
-@router.post("/refresh", response_model=LoginResponse)
+@router.post("/refresh", responses={200: {"model": LoginResponse}})
 async def refresh_token(
     request: Request,
     refresh_request: RefreshRequest,
@@ -171,16 +182,16 @@ async def refresh_token(
             user_id=user_id,
             event_type="TOKEN_REFRESHED",
             success=True,
-            details={"client_ip": request.client.host}
+            details={"client_ip": _client_ip(request)}
         )
         
-        return LoginResponse(
+        return _model_response(LoginResponse(
             access_token=session_data["access_token"],
             refresh_token=session_data["refresh_token"],
             token_type=session_data["token_type"],
             expires_in=session_data["expires_in"],
             user=user_data
-        )
+        ))
         
     except HTTPException:
         raise
@@ -188,7 +199,7 @@ async def refresh_token(
         audit_logger.log_security_event(
             event_type="TOKEN_REFRESH_ERROR",
             severity="ERROR",
-            details={"error": str(e), "client_ip": request.client.host}
+            details={"error": str(e), "client_ip": _client_ip(request)}
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -214,7 +225,7 @@ async def logout(
             user_id=current_user.id,
             event_type="LOGOUT",
             success=True,
-            details={"client_ip": request.client.host, "session_id": session_id}
+            details={"client_ip": _client_ip(request), "session_id": session_id}
         )
         
         return {"message": "Successfully logged out"}
@@ -230,7 +241,7 @@ async def logout(
             detail="Logout service error"
         )
 
-@router.post("/create-user", response_model=UserResponse)
+@router.post("/create-user", responses={200: {"model": UserResponse}})
 async def create_user(
     request: Request,
     create_request: CreateUserRequest,
@@ -259,17 +270,17 @@ async def create_user(
             user_id=user.id,
             event_type="USER_CREATED",
             success=True,
-            details={"client_ip": request.client.host, "device_id": create_request.device_id}
+            details={"client_ip": _client_ip(request), "device_id": create_request.device_id}
         )
         
-        return UserResponse(
+        return _model_response(UserResponse(
             id=user.id,
             device_id=user.device_id,
             preferences=user.preferences,
             created_at=user.created_at,
             last_login=user.last_login,
             is_active=user.is_active
-        )
+        ))
         
     except HTTPException:
         raise
@@ -277,43 +288,56 @@ async def create_user(
         audit_logger.log_security_event(
             event_type="USER_CREATION_ERROR",
             severity="ERROR",
-            details={"error": str(e), "client_ip": request.client.host}
+            details={"error": str(e), "client_ip": _client_ip(request)}
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="User creation service error"
         )
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", responses={200: {"model": UserResponse}})
 async def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
     """
     Get current user information
     """
-    return UserResponse(
+    return _model_response(UserResponse(
         id=current_user.id,
         device_id=current_user.device_id,
         preferences=current_user.preferences,
         created_at=current_user.created_at,
         last_login=current_user.last_login,
         is_active=current_user.is_active
-    )
+    ))
+
+# The health payload is constant apart from its timestamp, so it is encoded once
+_AUTH_HEALTH_PREFIX = json.dumps({
+    "status": "healthy",
+    "service": "authentication",
+    "features": [
+        "PIN Authentication",
+        "JWT Tokens",
+        "Session Management",
+        "Rate Limiting",
+        "Security Audit Logging"
+    ]
+}, separators=(",", ":"))[:-1].encode() + b',"timestamp":"'
+
+# Probes hit this constantly; the full body is rebuilt at most this often
+AUTH_HEALTH_TTL_SECONDS = 0.5
+_auth_health_body: Tuple[float, bytes] = (float("-inf"), b"")
 
 @router.get("/health")
 async def auth_health_check():
     """
     Authentication service health check
     """
-    return {
-        "status": "healthy",
-        "service": "authentication",
-        "timestamp": datetime.utcnow().isoformat(),
-        "features": [
-            "PIN Authentication",
-            "JWT Tokens",
-            "Session Management",
-            "Rate Limiting",
-            "Security Audit Logging"
-        ]
-    }
+    global _auth_health_body
+    now = time.monotonic()
+    built_at, body = _auth_health_body
+    if now - built_at >= AUTH_HEALTH_TTL_SECONDS:
+        timestamp = datetime.now(timezone.utc).isoformat().encode()
+        body = _AUTH_HEALTH_PREFIX + timestamp + b'"}'
+        _auth_health_body = (now, body)
+    return Response(content=body, media_type="application/json")
@@ -1,19 +1,40 @@
+import asyncio
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, date
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
-from sqlmodel import select
 from sqlmodel import Session
 
-from ..core.database import db_manager, User, Conversation, Message
+from ..core.database import (
+    db_manager, bulk_insert_messages, Conversation,
+    SELECT_CONVERSATION_STMT, SELECT_MESSAGES_STMT, SELECT_CONVERSATIONS_STMT,
+    SELECT_CONVERSATIONS_AFTER_STMT, SELECT_CONVERSATION_UPDATED_AT_STMT,
+    SELECT_USER_RETENTION_DAYS_STMT, DELETE_CONVERSATION_MESSAGES_STMT, DELETE_CONVERSATION_STMT,
+    DELETE_EXPIRED_MESSAGES_STMT, DELETE_EXPIRED_CONVERSATIONS_STMT
+)
 from ..core.security import get_encryption_manager
 
 logger = logging.getLogger("conversation_service")
 encryption_manager = get_encryption_manager()
 
+DEFAULT_RETENTION_DAYS = 30
+
+# Users' ai_data_retention_days: user_id -> (days, monotonic expiry)
+RETENTION_CACHE_SIZE = 1024
+RETENTION_CACHE_TTL_SECONDS = 300
+_retention_days_cache: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+_retention_days_lock = threading.Lock()
+
 
 class ConversationService:
-    """Service for managing conversations and messages (with encryption + retention)"""
+    """Service for managing conversations and messages (with encryption + retention)
+
+    Sessions are synchronous, so each async method runs its blocking
+    counterpart (_<name>) on a worker thread to keep the event loop free.
+    """
 
     def __init__(self):
         self.db_manager = db_manager
@@ -21,26 +42,32 @@ class ConversationService:
 
     async def get_conversation(self, conversation_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Return a conversation and decrypted messages for the given user."""
-        session: Session = self.db_manager.get_session()
+        return await asyncio.to_thread(self._get_conversation, conversation_id, user_id)
+
+    def _get_conversation(self, conversation_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        session: Session = self.db_manager.get_read_session()
         try:
-            stmt = select(Conversation).where(Conversation.id == conversation_id, Conversation.user_id == user_id)
-            convo = session.exec(stmt).one_or_none()
+            convo = session.execute(
+                SELECT_CONVERSATION_STMT, {"cid": conversation_id, "uid": user_id}
+            ).scalars().one_or_none()
             if not convo:
                 return None
 
             # Load messages
-            msg_stmt = select(Message).where(Message.conversation_id == convo.id).order_by(Message.timestamp)
-            msgs = session.exec(msg_stmt).all()
+            msgs = session.execute(SELECT_MESSAGES_STMT, {"cid": convo.id}).all()
+
+            # Decrypt all messages in one batch if possible
+            try:
+                contents = self.encryption.decrypt_many([m.content for m in msgs])
+            except Exception:
+                contents = [None] * len(msgs)
 
             messages = []
-            for m in msgs:
-                content = m.content
-                try:
-                    # Decrypt if possible
-                    content = self.encryption.decrypt_data(content)
-                except Exception:
+            for m, content in zip(msgs, contents):
+                if content is None:
                     # If decryption fails, fall back to stored content
                     logger.debug("Message decryption failed or not encrypted; returning raw content")
+                    content = m.content.decode(errors="replace")
                 messages.append(
                     {
                         "id": str(m.id),
@@ -61,12 +88,41 @@ class ConversationService:
         finally:
             session.close()
 
-    async def get_conversations(self, user_id: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
-        """List conversations for a user (no message payloads)"""
-        session: Session = self.db_manager.get_session()
+    async def get_conversation_updated_at(self, conversation_id: str, user_id: str) -> Optional[datetime]:
+        """Return a conversation's last-modified time (None if it doesn't exist for the user)"""
+        return await asyncio.to_thread(self._get_conversation_updated_at, conversation_id, user_id)
+
+    def _get_conversation_updated_at(self, conversation_id: str, user_id: str) -> Optional[datetime]:
+        session: Session = self.db_manager.get_read_session()
+        try:
+            return session.execute(
+                SELECT_CONVERSATION_UPDATED_AT_STMT, {"cid": conversation_id, "uid": user_id}
+            ).scalar_one_or_none()
+        finally:
+            session.close()
+
+    async def get_conversations(self, user_id: str, limit: int = 20, offset: int = 0,
+                                after: Optional[Tuple[datetime, str]] = None) -> List[Dict[str, Any]]:
+        """
+        List conversations for a user (no message payloads), most recently updated first.
+        Pass the (updated_at, id) of the previous page's last conversation as `after`
+        to page by key instead of by offset.
+        """
+        return await asyncio.to_thread(self._get_conversations, user_id, limit, offset, after)
+
+    def _get_conversations(self, user_id: str, limit: int = 20, offset: int = 0,
+                           after: Optional[Tuple[datetime, str]] = None) -> List[Dict[str, Any]]:
+        session: Session = self.db_manager.get_read_session()
         try:
-            stmt = select(Conversation).where(Conversation.user_id == user_id).order_by(Conversation.updated_at.desc()).limit(limit).offset(offset)
-            rows = session.exec(stmt).all()
+            if after is not None:
+                rows = session.execute(
+                    SELECT_CONVERSATIONS_AFTER_STMT,
+                    {"uid": user_id, "updated_at": after[0], "cid": after[1], "limit": limit}
+                ).all()
+            else:
+                rows = session.execute(
+                    SELECT_CONVERSATIONS_STMT, {"uid": user_id, "limit": limit, "offset": offset}
+                ).all()
             results = []
             for c in rows:
                 results.append({
@@ -85,99 +141,123 @@ class ConversationService:
         Create (or append) a message in a conversation.
         Ensures content is encrypted before storage.
         """
+        return (await self.create_messages(conversation_id, user_id, [(sender, content)]))[0]
+
+    async def create_messages(self, conversation_id: str, user_id: str,
+                              messages: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Append (sender, content) messages to a conversation in one transaction.
+        Content is encrypted in one batch and inserted with a single executemany.
+        """
+        return await asyncio.to_thread(self._create_messages, conversation_id, user_id, messages)
+
+    def _create_messages(self, conversation_id: str, user_id: str,
+                         messages: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
         session: Session = self.db_manager.get_session()
         try:
             # Ensure conversation exists (and belongs to user)
-            stmt = select(Conversation).where(Conversation.id == conversation_id, Conversation.user_id == user_id)
-            convo = session.exec(stmt).one_or_none()
+            convo = session.execute(
+                SELECT_CONVERSATION_STMT, {"cid": conversation_id, "uid": user_id}
+            ).scalars().one_or_none()
             if not convo:
-                # create it
-                convo = Conversation(user_id=user_id)
+                # create it, with its retention date in the same INSERT
+                convo = Conversation(user_id=user_id,
+                                     retention_until=self._retention_until(session, user_id))
                 session.add(convo)
-                session.commit()
-                session.refresh(convo)
+                session.flush()
 
             # Encrypt content if encryption manager initialized
+            contents = [content for _, content in messages]
             try:
-                encrypted = self.encryption.encrypt_data(content)
+                encrypted = self.encryption.encrypt_many(contents)
             except Exception:
                 # If encryption not initialized, store raw content but log warning
                 logger.warning("Encryption not initialized; storing message as plaintext")
-                encrypted = content
+                encrypted = [content.encode() for content in contents]
 
-            msg = Message(conversation_id=convo.id, sender=sender, content=encrypted, timestamp=datetime.utcnow())
-            session.add(msg)
+            now = datetime.utcnow()
+            rows = bulk_insert_messages(session, [
+                {"conversation_id": convo.id, "sender": sender, "content": blob, "timestamp": now}
+                for (sender, _), blob in zip(messages, encrypted)
+            ])
 
             # update conversation timestamp
-            convo.updated_at = datetime.utcnow()
-            # If retention_until not set, set based on user's preference if available
+            convo.updated_at = now
+            # Conversations stored before retention was tracked
             if convo.retention_until is None:
-                # Attempt to read user's retention days from DB (if User exists)
-                try:
-                    user_stmt = select(User).where(User.id == user_id)
-                    usr = session.exec(user_stmt).one_or_none()
-                    days = 30
-                    if usr and getattr(usr, "ai_data_retention_days", None):
-                        days = usr.ai_data_retention_days
-                    convo.retention_until = (date.today() + timedelta(days=days))
-                except Exception:
-                    convo.retention_until = (date.today() + timedelta(days=30))
+                convo.retention_until = self._retention_until(session, user_id)
 
+            convo_id = str(convo.id)
             session.add(convo)
             session.commit()
-            session.refresh(msg)
 
-            return {
-                "id": str(msg.id),
-                "conversation_id": str(convo.id),
-                "sender": msg.sender,
-                "timestamp": msg.timestamp.isoformat()
-            }
+            return [
+                {
+                    "id": str(row["id"]),
+                    "conversation_id": convo_id,
+                    "sender": row["sender"],
+                    "timestamp": row["timestamp"].isoformat()
+                }
+                for row in rows
+            ]
         finally:
             session.close()
 
+    @staticmethod
+    def _retention_until(session: Session, user_id: str) -> date:
+        """Retention date for a new conversation, from the user's (cached) preference"""
+        now = time.monotonic()
+        entry = _retention_days_cache.get(user_id)
+        if entry is not None and entry[1] > now:
+            days = entry[0]
+        else:
+            try:
+                days = session.execute(
+                    SELECT_USER_RETENTION_DAYS_STMT, {"uid": user_id}
+                ).scalar_one_or_none() or DEFAULT_RETENTION_DAYS
+            except Exception:
+                days = DEFAULT_RETENTION_DAYS
+            with _retention_days_lock:
+                _retention_days_cache[user_id] = (days, now + RETENTION_CACHE_TTL_SECONDS)
+                _retention_days_cache.move_to_end(user_id)
+                if len(_retention_days_cache) > RETENTION_CACHE_SIZE:
+                    _retention_days_cache.popitem(last=False)
+        return date.today() + timedelta(days=days)
+
     async def delete_conversation(self, conversation_id: str, user_id: str) -> bool:
         """Delete a conversation and its messages (permanent)."""
+        return await asyncio.to_thread(self._delete_conversation, conversation_id, user_id)
+
+    def _delete_conversation(self, conversation_id: str, user_id: str) -> bool:
         session: Session = self.db_manager.get_session()
         try:
-            stmt = select(Conversation).where(Conversation.id == conversation_id, Conversation.user_id == user_id)
-            convo = session.exec(stmt).one_or_none()
-            if not convo:
-                return False
-
-            # Delete messages
-            msg_stmt = select(Message).where(Message.conversation_id == convo.id)
-            msgs = session.exec(msg_stmt).all()
-            for m in msgs:
-                session.delete(m)
-
-            session.delete(convo)
+            params = {"cid": conversation_id, "uid": user_id}
+            session.execute(DELETE_CONVERSATION_MESSAGES_STMT, params)
+            deleted = session.execute(DELETE_CONVERSATION_STMT, params).rowcount
             session.commit()
-            return True
+            return deleted > 0
         finally:
             session.close()
 
     async def purge_expired(self) -> int:
         """Find and delete conversations whose retention_until date is past."""
+        return await asyncio.to_thread(self._purge_expired)
+
+    def _purge_expired(self) -> int:
         session: Session = self.db_manager.get_session()
         try:
-            today = date.today()
-            stmt = select(Conversation).where(Conversation.retention_until != None, Conversation.retention_until < today)
-            expired = session.exec(stmt).all()
-            count = 0
-            for c in expired:
-                msg_stmt = select(Message).where(Message.conversation_id == c.id)
-                msgs = session.exec(msg_stmt).all()
-                for m in msgs:
-                    session.delete(m)
-                session.delete(c)
-                count += 1
+            params = {"today": date.today()}
+            session.execute(DELETE_EXPIRED_MESSAGES_STMT, params)
+            count = session.execute(DELETE_EXPIRED_CONVERSATIONS_STMT, params).rowcount
             session.commit()
             return count
         finally:
             session.close()
 
 
+# Global conversation service instance (stateless, shared by all requests)
+conversation_service = ConversationService()
+
 # FastAPI dependency provider
 def get_conversation_service() -> ConversationService:
-    return ConversationService()
+    return conversation_service
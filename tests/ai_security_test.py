@@ -0,0 +1,65 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.core import database
+from backend.core.ai_security import AISecurityFilter, PrivacyManager
+
+class TestSensitiveDataMasking(unittest.TestCase):
+    def setUp(self):
+        self.filter = AISecurityFilter()
+
+    def test_unicode_digits_masked_like_ascii(self):
+        """Account numbers are redacted whatever script their digits are written in."""
+        for digits in ("12345678901", "١٢٣٤٥٦٧٨٩٠١", "１２３４５６７８９０１"):
+            with self.subTest(digits=digits):
+                self.assertEqual(
+                    self.filter._mask_sensitive_data(f"acct {digits} ok"),
+                    ("acct [REDACTED] ok", 1)
+                )
+
+    def test_counts_each_match(self):
+        """Every occurrence is replaced and counted once."""
+        masked, count = self.filter._mask_sensitive_data(
+            "ssn 123-45-6789, mail a@b.com, call (555) 123-4567"
+        )
+        self.assertEqual(masked, "ssn [REDACTED], mail [REDACTED], call [REDACTED]")
+        self.assertEqual(count, 3)
+
+    def test_clean_text_untouched(self):
+        self.assertEqual(self.filter._mask_sensitive_data("lunch budget"), ("lunch budget", 0))
+
+class TestConsent(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        url = "sqlite:///" + os.path.join(self.tmp.name, "consent.db")
+        with mock.patch.object(database, "DATABASE_URL", url):
+            database.db_manager.initialize_database()
+        session = database.db_manager.get_session()
+        user = database.User(pin_hash="x")
+        session.add(user)
+        session.commit()
+        self.user_id = str(user.id)
+        session.close()
+        self.privacy = PrivacyManager()
+
+    def tearDown(self):
+        database.db_manager.engine.dispose()
+        database.db_manager.read_engine.dispose()
+        self.tmp.cleanup()
+
+    def uses_local(self) -> bool:
+        return asyncio.run(self.privacy.should_use_local_processing("lunch budget", {}, self.user_id))
+
+    def test_withdrawn_consent_applies_immediately(self):
+        """Withdrawing consent forces local processing on the very next query."""
+        self.assertFalse(self.uses_local())  # consent (default) is now cached
+        self.privacy.set_ai_data_consent(self.user_id, False)
+        self.assertTrue(self.uses_local())
+        self.privacy.set_ai_data_consent(self.user_id, True)
+        self.assertFalse(self.uses_local())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+from backend.core import database
+from backend.core.security import get_encryption_manager
+from backend.services.conversation_service import ConversationService
+from tests.encryption_compat_test import PIN, baseline_encrypt
+
+# Schema as created by the original (SQLModel GUID / Fernet TEXT) models
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id CHAR(32) NOT NULL,
+    pin_hash VARCHAR NOT NULL,
+    device_id VARCHAR,
+    preferences JSON,
+    created_at DATETIME NOT NULL,
+    last_login DATETIME,
+    is_active BOOLEAN NOT NULL,
+    ai_data_consent BOOLEAN NOT NULL,
+    ai_data_retention_days INTEGER NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_users_pin_hash ON users (pin_hash);
+CREATE TABLE conversations (
+    id CHAR(32) NOT NULL,
+    user_id CHAR(32) NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    retention_until DATE,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE messages (
+    id CHAR(32) NOT NULL,
+    conversation_id CHAR(32) NOT NULL,
+    sender VARCHAR NOT NULL,
+    content VARCHAR NOT NULL,
+    timestamp DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(conversation_id) REFERENCES conversations (id)
+);
+"""
+
+def run(coro):
+    return asyncio.run(coro)
+
+class TestBaselineDatabaseUpgrade(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "baseline.db")
+
+        # A database written by the original code: hex TEXT ids, base64 TEXT content
+        self.legacy_user, self.legacy_convo, legacy_message = uuid4(), uuid4(), uuid4()
+        connection = sqlite3.connect(path)
+        connection.executescript(BASELINE_SCHEMA)
+        connection.execute(
+            "INSERT INTO users VALUES (?, 'hash', NULL, '{\"theme\": \"dark\"}', "
+            "'2025-08-01 09:00:00.000000', NULL, 1, 1, 30)",
+            (self.legacy_user.hex,)
+        )
+        connection.execute(
+            "INSERT INTO conversations VALUES (?, ?, '2025-08-01 09:00:00.000000', "
+            "'2025-08-01 09:05:00.000000', NULL)",
+            (self.legacy_convo.hex, self.legacy_user.hex)
+        )
+        connection.execute(
+            "INSERT INTO messages VALUES (?, ?, 'user', ?, '2025-08-01 09:05:00.000000')",
+            (legacy_message.hex, self.legacy_convo.hex, baseline_encrypt("How much did I spend?"))
+        )
+        connection.commit()
+        connection.close()
+
+        get_encryption_manager().initialize_encryption(PIN)
+        with mock.patch.object(database, "DATABASE_URL", "sqlite:///" + path):
+            database.db_manager.initialize_database()
+        self.path = path
+        self.service = ConversationService()
+
+    def tearDown(self):
+        database.db_manager.engine.dispose()
+        database.db_manager.read_engine.dispose()
+        self.tmp.cleanup()
+
+    def test_startup_converts_legacy_rows(self):
+        """Ids and message contents are rewritten as BLOBs and the indexes are created."""
+        connection = sqlite3.connect(self.path)
+        try:
+            for table, column in (("users", "id"), ("conversations", "user_id"),
+                                  ("messages", "conversation_id"), ("messages", "content")):
+                self.assertEqual(
+                    connection.execute(f"SELECT DISTINCT typeof({column}) FROM {table}").fetchall(),
+                    [("blob",)]
+                )
+            indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        finally:
+            connection.close()
+        self.assertTrue({"ix_conv_user_updated", "ix_conversations_retention_until", "ix_msg_conv_ts"} <= indexes)
+
+    def test_legacy_conversation_readable(self):
+        convo = run(self.service.get_conversation(str(self.legacy_convo), str(self.legacy_user)))
+        self.assertEqual(convo["user_id"], str(self.legacy_user))
+        self.assertEqual([m["content"] for m in convo["messages"]], ["How much did I spend?"])
+
+    def test_new_user_conversations_and_paging(self):
+        """Inserts work against the old tables and both paging modes see every conversation once."""
+        session = database.db_manager.get_session()
+        user = database.User(pin_hash="hash")
+        session.add(user)
+        session.commit()
+        user_id = str(user.id)
+        session.close()
+
+        for i in range(5):
+            run(self.service.create_messages(str(uuid4()), user_id, [("user", f"q{i}"), ("ai", f"a{i}")]))
+        # Appending to the legacy conversation works too
+        run(self.service.create_message(str(self.legacy_convo), str(self.legacy_user), "ai", "About $84."))
+
+        by_offset = [c["id"] for offset in range(0, 6, 2)
+                     for c in run(self.service.get_conversations(user_id, limit=2, offset=offset))]
+        by_key, after = [], None
+        while True:
+            page = run(self.service.get_conversations(user_id, limit=2, after=after))
+            if not page:
+                break
+            by_key.extend(c["id"] for c in page)
+            after = (page[-1]["updated_at"], page[-1]["id"])
+
+        self.assertEqual(len(by_offset), 5)
+        self.assertEqual(by_key, by_offset)
+        newest = run(self.service.get_conversation(by_offset[0], user_id))
+        self.assertEqual([m["content"] for m in newest["messages"]], ["q4", "a4"])
+        self.assertEqual(
+            [m["content"] for m in run(self.service.get_conversation(
+                str(self.legacy_convo), str(self.legacy_user)))["messages"]],
+            ["How much did I spend?", "About $84."]
+        )
+
+if __name__ == "__main__":
+    unittest.main()
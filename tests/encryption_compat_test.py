@@ -0,0 +1,53 @@
+import base64
+import unittest
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from backend.core.security import (
+    EncryptionManager,
+    SecurityException,
+    ENCRYPTION_KEY_SALT,
+    LEGACY_KDF_ITERATIONS,
+)
+
+PIN = "4821"
+
+def baseline_encrypt(plaintext: str, pin: str = PIN) -> str:
+    """Encrypt the way the Fernet-based EncryptionManager stored values"""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=ENCRYPTION_KEY_SALT,
+        iterations=LEGACY_KDF_ITERATIONS,
+    )
+    fernet = Fernet(base64.urlsafe_b64encode(kdf.derive(pin.encode())))
+    return base64.urlsafe_b64encode(fernet.encrypt(plaintext.encode())).decode()
+
+class TestEncryptionCompatibility(unittest.TestCase):
+    def setUp(self):
+        self.manager = EncryptionManager()
+        self.manager.initialize_encryption(PIN)
+
+    def test_round_trip(self):
+        """Values encrypted now decrypt singly and in a batch."""
+        blobs = self.manager.encrypt_many(["groceries: $84.12", "rent"])
+        self.assertEqual(self.manager.decrypt_data(blobs[0]), "groceries: $84.12")
+        self.assertEqual(self.manager.decrypt_many(blobs), ["groceries: $84.12", "rent"])
+
+    def test_baseline_fernet_values_decrypt(self):
+        """Values stored by the Fernet implementation still decrypt."""
+        stored = baseline_encrypt("Paid electric bill $120.50")
+        self.assertEqual(self.manager.decrypt_data(stored.encode()), "Paid electric bill $120.50")
+        self.assertEqual(self.manager.decrypt_many([stored.encode()]), ["Paid electric bill $120.50"])
+
+    def test_wrong_key_fails(self):
+        """Tampered or foreign values are rejected rather than returned."""
+        stored = baseline_encrypt("secret", pin="9999")
+        with self.assertRaises(SecurityException):
+            self.manager.decrypt_data(stored.encode())
+        self.assertEqual(self.manager.decrypt_many([stored.encode(), b"not encrypted"]), [None, None])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from backend.ai.stream_filter import FinalAnswerStream
+
+def stream(calls):
+    """Feed token lists (one per LLM call) through the filter, like the crew's token handler"""
+    answer = FinalAnswerStream()
+    out = []
+    for tokens in calls:
+        answer.reset()
+        out.extend(text for text in map(answer.feed, tokens) if text)
+    return "".join(out)
+
+class TestFinalAnswerStream(unittest.TestCase):
+    def test_only_final_answer_streamed(self):
+        """Reasoning steps and tool calls are dropped; the answer streams token by token."""
+        calls = [
+            ["Thought", ": I need", " the data\n", "Action", ": Search\n", "Action Input: {\"q\": 1}"],
+            ["Thought: done\n", "Final", " Answer", ":", " You spent", " $84", " on groceries."],
+        ]
+        self.assertEqual(stream(calls), "You spent $84 on groceries.")
+
+    def test_marker_split_across_tokens(self):
+        self.assertEqual(stream([["Fin", "al Ans", "wer:  Save", " more"]]), "Save more")
+
+    def test_no_marker_streams_nothing(self):
+        self.assertEqual(stream([['{"answer": "x"}']]), "")
+
+if __name__ == "__main__":
+    unittest.main()